@@ -0,0 +1,101 @@
+"""
+Measure the memory used by what a run keeps of a large uv.lock: the full TOML
+document, as kept before uv.lock was pruned and interned, against the pruned
+document used by the lock resolver and the table of package versions. Each
+variant runs in its own process, so that peak RSS isn't shared. Peak and
+retained are the Python allocations made by the variant, as seen by tracemalloc.
+
+    $ uv run python benchmarks/lock_memory.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from typing import Any, Callable
+
+from scaling import generate_uv_lock
+
+from sync_pre_commit_with_uv import lock, toml
+
+PACKAGES = 10_000
+WHEELS = 5
+
+
+def load_full(text: str) -> Any:
+    return toml.parse_toml(text), lock.read_package_versions(text)
+
+
+def load_compact(text: str) -> Any:
+    return lock.parse_lock(text), lock.PackageTable.from_text(text)
+
+
+VARIANTS: dict[str, Callable[[str], Any]] = {
+    "full TOML document": load_full,
+    "pruned and interned": load_compact,
+}
+
+
+def get_max_rss() -> int:
+    """Peak RSS of the process, in bytes."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def measure(variant: str, path: pathlib.Path) -> dict[str, int]:
+    text = path.read_text()
+    load = VARIANTS[variant]
+
+    kept = load(text)
+    # Includes the interpreter and the text of uv.lock, the same for all variants
+    peak_rss = get_max_rss()
+    del kept
+    gc.collect()
+
+    # Run again with tracemalloc, which inflates RSS
+    tracemalloc.start()
+    kept = load(text)  # noqa: F841
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_rss": peak_rss, "peak": peak, "retained": retained}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--lock", type=pathlib.Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.lock)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "uv.lock"
+        path.write_text(generate_uv_lock(PACKAGES, repos=10, wheels=WHEELS))
+        print(f"{PACKAGES} packages, {path.stat().st_size / 2**20:.1f} MiB")
+        print(f"{'':<24} {'peak RSS':>12} {'peak':>12} {'retained':>12}")
+        for variant in VARIANTS:
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--variant", variant, "--lock", str(path)],
+                text=True,
+            )
+            result = json.loads(output)
+            print(
+                f"{variant:<24} "
+                + " ".join(
+                    f"{result[key] / 2**20:>8.1f} MiB"
+                    for key in ("peak_rss", "peak", "retained")
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Measure how sync() scales with the size of uv.lock and of the pre-commit
+configuration, on synthetic projects. uv is replaced by a fake export with a
+configurable latency, used for the hooks whose dependencies can't be computed
+from uv.lock.
+
+    $ uv run python benchmarks/scaling.py
+    $ uv run python benchmarks/scaling.py --save-baseline
+    $ uv run python benchmarks/scaling.py --baseline benchmarks/baseline.json
+
+When comparing against a baseline, exits with 1 if a scenario got slower or used
+more memory than the tolerance allows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import NamedTuple
+
+from sync_pre_commit_with_uv import profiling, sync
+
+DEFAULT_BASELINE = pathlib.Path(__file__).parent / "baseline.json"
+
+# Number of packages in uv.lock, number of repos in the pre-commit configuration
+SCENARIOS = [(100, 10), (1_000, 100), (10_000, 500)]
+
+# Phases of the profile, grouped as they are reported
+PHASES = {
+    "parse": [
+        "parse pyproject.toml",
+        "parse uv.lock",
+        "load pre-commit config",
+        "validate configuration",
+        "read locked versions",
+    ],
+    "sync": [profiling.HOOK_EXPORT],
+    "dump": ["dump pre-commit config"],
+}
+
+
+def package_name(index: int) -> str:
+    return f"pkg-{index:05d}"
+
+
+def get_dependencies(index: int) -> list[int]:
+    """A few dependencies per package, so that closures stay reasonably small."""
+    return sorted({index // 2, index // 3} - {index})
+
+
+def generate_uv_lock(packages: int, repos: int, wheels: int = 0) -> str:
+    """
+    Return a uv.lock with the given number of packages, and one dependency group
+    per repo. One package out of 10 is only needed on Windows, so the groups
+    depending on it can't be computed without uv.
+
+    With `wheels`, each package also gets an sdist and that many wheels, which
+    is what makes up most of real uv.lock files.
+    """
+    lines = [
+        "version = 1",
+        "revision = 3",
+        'requires-python = ">=3.9"',
+        "",
+        "[[package]]",
+        'name = "bench"',
+        'version = "0.1.0"',
+        'source = { virtual = "." }',
+        "",
+        "[package.dev-dependencies]",
+    ]
+    for repo in range(repos):
+        lines.append(f'g{repo} = [{{ name = "{package_name(repo * 7 % packages)}" }}]')
+    for index in range(packages):
+        lines += [
+            "",
+            "[[package]]",
+            f'name = "{package_name(index)}"',
+            'version = "1.0.0"',
+            'source = { registry = "https://pypi.org/simple" }',
+        ]
+        dependencies = []
+        for dependency in get_dependencies(index):
+            marker = (
+                ", marker = \"sys_platform == 'win32'\"" if dependency % 10 == 9 else ""
+            )
+            dependencies.append(f'{{ name = "{package_name(dependency)}"{marker} }}')
+        if dependencies:
+            lines.append(f"dependencies = [{', '.join(dependencies)}]")
+        if wheels:
+            url = f"https://files.example.com/{package_name(index)}-1.0.0"
+            lines.append(
+                f'sdist = {{ url = "{url}.tar.gz", hash = "sha256:{index:064x}" }}'
+            )
+            lines.append("wheels = [")
+            lines += [
+                f'    {{ url = "{url}-cp3{wheel}-none-any.whl", '
+                f'hash = "sha256:{index * 100 + wheel:064x}", size = 1024 }},'
+                for wheel in range(wheels)
+            ]
+            lines.append("]")
+    return "\n".join(lines) + "\n"
+
+
+def generate_pyproject(packages: int, repos: int) -> str:
+    lines = ["[project]", 'name = "bench"', 'version = "0.1.0"']
+    for repo in range(repos):
+        lines += [
+            "",
+            f"[tool.sync-pre-commit-with-uv.tool-{repo}]",
+            f'pypi_package_name = "{package_name(repo % packages)}"',
+            f'additional_dependencies_uv_params = ["--only-group", "g{repo}"]',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def generate_pre_commit_config(repos: int) -> str:
+    lines = ["repos:"]
+    for repo in range(repos):
+        lines += [
+            f"  - repo: https://github.com/bench/tool-{repo}",
+            "    rev: v0.0.1",
+            "    hooks:",
+            f"      - id: tool-{repo}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def get_fake_uv_export(latency: float) -> sync.UvExportProtocol:
+    def uv_export(params: list[str]) -> list[str]:
+        time.sleep(latency)
+        return [f"{package_name(0)}==1.0.0"]
+
+    return uv_export
+
+
+class Result(NamedTuple):
+    total: float
+    phases: dict[str, float]
+    peak_memory: int
+    uv_export_calls: int
+
+
+def run_once(
+    directory: pathlib.Path, packages: int, repos: int, latency: float
+) -> tuple[float, profiling.Profile, sync.SyncSummary]:
+    # Reset the files, as a run rewrites the pre-commit configuration
+    (directory / "pyproject.toml").write_text(generate_pyproject(packages, repos))
+    (directory / "uv.lock").write_text(generate_uv_lock(packages, repos))
+    (directory / ".pre-commit-config.yaml").write_text(
+        generate_pre_commit_config(repos)
+    )
+    profile = profiling.Profile()
+    start = time.perf_counter()
+    summary = sync.sync(
+        pyproject_path=directory / "pyproject.toml",
+        pre_commit_path=directory / ".pre-commit-config.yaml",
+        uv_lock_path=directory / "uv.lock",
+        uv_export=get_fake_uv_export(latency),
+        profile=profile,
+    )
+    return time.perf_counter() - start, profile, summary
+
+
+def run_scenario(packages: int, repos: int, latency: float, runs: int) -> Result:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        # Timings come from the best run without tracemalloc, which slows
+        # everything down.
+        total, profile, summary = min(
+            (run_once(directory, packages, repos, latency) for _ in range(runs)),
+            key=lambda result: result[0],
+        )
+        tracemalloc.start()
+        try:
+            run_once(directory, packages, repos, latency)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    phases = profile.get_phases()
+    return Result(
+        total=total,
+        phases={
+            group: sum(phases.get(name, (0, 0.0))[1] for name in names)
+            for group, names in PHASES.items()
+        },
+        peak_memory=peak_memory,
+        uv_export_calls=summary.uv_export_calls,
+    )
+
+
+def get_regressions(
+    results: dict[str, Result], baseline: dict[str, dict[str, float]], tolerance: float
+) -> list[str]:
+    regressions = []
+    for scenario, result in results.items():
+        if scenario not in baseline:
+            continue
+        for metric in ("total", "peak_memory"):
+            value, reference = getattr(result, metric), baseline[scenario][metric]
+            if value > reference * (1 + tolerance):
+                regressions.append(
+                    f"{scenario}: {metric} went from {reference:g} to {value:g}"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per uv export."
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", type=pathlib.Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative increase over the baseline.",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        f"{'packages/repos':<16} {'total':>10} {'parse':>10} {'sync':>10} "
+        f"{'dump':>10} {'peak mem':>10} {'uv calls':>9}"
+    )
+    for packages, repos in SCENARIOS:
+        scenario = f"{packages}/{repos}"
+        result = run_scenario(packages, repos, latency=args.latency, runs=args.runs)
+        results[scenario] = result
+        print(
+            f"{scenario:<16} "
+            + " ".join(
+                f"{profiling.format_duration(value):>10}"
+                for value in [result.total, *result.phases.values()]
+            )
+            + f" {result.peak_memory / 2**20:>7.1f} MiB {result.uv_export_calls:>9}"
+        )
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    scenario: {"total": r.total, "peak_memory": r.peak_memory}
+                    for scenario, r in results.items()
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = get_regressions(
+            results, json.loads(args.baseline.read_text()), tolerance=args.tolerance
+        )
+        if regressions:
+            sys.exit("Regressions:\n" + "\n".join(regressions))
+        print(f"No regression compared to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
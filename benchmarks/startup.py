@@ -0,0 +1,75 @@
+"""
+Measure the cold start of the hook: how long it takes to import the sync module,
+and to run the CLI end to end on a small project with nothing to do.
+
+    $ uv run python benchmarks/startup.py
+"""
+
+from __future__ import annotations
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 10
+
+PYPROJECT = """[project]
+name = "demo"
+version = "0.1.0"
+
+[tool.sync-pre-commit-with-uv.ruff-pre-commit]
+pypi_package_name = "ruff"
+"""
+
+UV_LOCK = """version = 1
+revision = 3
+requires-python = ">=3.9"
+
+[[package]]
+name = "ruff"
+version = "0.6.0"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+PRE_COMMIT_CONFIG = """repos:
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: v0.6.0
+    hooks:
+      - id: ruff
+"""
+
+
+def best_time(args: list[str], cwd: pathlib.Path) -> float:
+    """Return the best wall time of running the command, in milliseconds."""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=cwd, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory)
+        (path / "pyproject.toml").write_text(PYPROJECT)
+        (path / "uv.lock").write_text(UV_LOCK)
+        (path / ".pre-commit-config.yaml").write_text(PRE_COMMIT_CONFIG)
+
+        baseline = best_time([sys.executable, "-c", "pass"], cwd=path)
+        import_sync = best_time(
+            [sys.executable, "-c", "import sync_pre_commit_with_uv.sync"], cwd=path
+        )
+        cli = best_time(
+            [sys.executable, "-m", "sync_pre_commit_with_uv", "--no-cache"], cwd=path
+        )
+
+    print(f"Python startup:          {baseline:7.1f} ms")
+    print(f"import sync module:      {import_sync - baseline:7.1f} ms")
+    print(f"CLI run (nothing to do): {cli - baseline:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
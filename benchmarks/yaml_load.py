@@ -0,0 +1,72 @@
+"""
+Compare the time yaml_roundtrip takes on a large pre-commit configuration when
+nothing changes (only the safe loader is used) and when one value changes (the
+file is loaded again with the round-trip loader, then dumped), with the time
+the round-trip loader alone takes. The safe loader is much faster when
+ruamel.yaml.clib is installed.
+
+    $ uv run python benchmarks/yaml_load.py
+"""
+
+from __future__ import annotations
+
+import pathlib
+import tempfile
+import time
+from collections.abc import Callable
+
+import ruamel.yaml
+from scaling import generate_pre_commit_config
+
+from sync_pre_commit_with_uv import sync
+
+RUNS = 5
+REPOS = 1_000
+
+
+def best_time(func: Callable[[], object], setup: Callable[[], object]) -> float:
+    """Return the best wall time of calling func, in milliseconds."""
+    times = []
+    for _ in range(RUNS):
+        setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main() -> None:
+    content = generate_pre_commit_config(REPOS)
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / ".pre-commit-config.yaml"
+
+        def reset() -> None:
+            path.write_text(content)
+
+        def roundtrip_load() -> None:
+            ruamel.yaml.YAML().load(path.read_text())
+
+        def unchanged() -> None:
+            with sync.yaml_roundtrip(path):
+                pass
+
+        def changed() -> None:
+            with sync.yaml_roundtrip(path) as document:
+                document.apply(
+                    sync.UpdateRev(
+                        repo="https://github.com/bench/tool-0", position=0, value="v1"
+                    )
+                )
+
+        round_trip = best_time(roundtrip_load, setup=reset)
+        no_change = best_time(unchanged, setup=reset)
+        one_change = best_time(changed, setup=reset)
+
+    print(f"{REPOS} repos, {len(content) / 1024:.0f} KiB")
+    print(f"round-trip load alone:          {round_trip:8.1f} ms")
+    print(f"yaml_roundtrip, no change:      {no_change:8.1f} ms")
+    print(f"yaml_roundtrip, one change:     {one_change:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import pathlib
 import sys
-from typing import NamedTuple
+import time
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from . import exceptions, sync
+from . import cache, discovery, exceptions, profiling, stamp, watch
+
+if TYPE_CHECKING:
+    from . import sync
 
 
 def existing_path(value: str) -> pathlib.Path:
@@ -16,6 +21,41 @@ def existing_path(value: str) -> pathlib.Path:
     return path
 
 
+def positive_float(value: str) -> float:
+    """Convert a string to a strictly positive number."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive number.")
+    return number
+
+
+def positive_int(value: str) -> int:
+    """Convert a string to a strictly positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive integer.")
+    return number
+
+
+class AppendToDefault(argparse.Action):
+    """
+    Like the "append" action, except that the first occurrence replaces the
+    default value instead of being appended to it.
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        current = getattr(namespace, self.dest)
+        if not isinstance(current, list):
+            current = []
+        setattr(namespace, self.dest, [*current, values])
+
+
 def get_parser():
     """Get the argument parser."""
     parser = argparse.ArgumentParser(
@@ -24,8 +64,16 @@ def get_parser():
     parser.add_argument(
         "--pyproject-config",
         type=existing_path,
+        action=AppendToDefault,
         default=pathlib.Path("pyproject.toml"),
-        help="Path to the pyproject.toml file. Defaults to 'pyproject.toml' in the current directory.",
+        help="Path to the pyproject.toml file. Defaults to 'pyproject.toml' in the current directory. Can be repeated to sync several projects.",
+    )
+    parser.add_argument(
+        "--discover",
+        type=existing_path,
+        default=None,
+        metavar="ROOT",
+        help="Sync all the projects found under ROOT: directories with a pyproject.toml and a .pre-commit-config.yaml, using their own uv.lock or the one of their uv workspace.",
     )
     parser.add_argument(
         "--pre-commit-config",
@@ -39,15 +87,89 @@ def get_parser():
         default=None,
         help="Path to the uv.lock file. Defaults to 'uv.lock' in the same directory as pyproject.toml.",
     )
-    # Actually useless but pre-commit will provide it.
-    parser.add_argument("files", nargs="*")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Maximum number of uv exports to run in parallel. Overrides the 'jobs' setting in pyproject.toml.",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Print a summary of the run.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Don't modify the pre-commit configuration, exit with an error if it's not in sync.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each phase of the run.",
+    )
+    parser.add_argument(
+        "--profile-json",
+        type=pathlib.Path,
+        default=None,
+        metavar="PATH",
+        help="Write the time spent in each phase of the run to PATH, as JSON.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=None,
+        help="Directory where uv export results are cached. Defaults to '$XDG_CACHE_HOME/sync-pre-commit-with-uv'.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write cached uv export results.",
+    )
+    parser.add_argument(
+        "--always-run",
+        action="store_true",
+        help="Sync even if none of the project's files is among FILES.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, and sync the projects again whenever one of their files changes. Parsed files and uv export results are kept in memory between syncs.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=positive_float,
+        default=0.5,
+        metavar="SECONDS",
+        help="With --watch, how often to check the files for changes. Defaults to 0.5.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=pathlib.Path,
+        default=None,
+        metavar="PATH",
+        help="With --watch, also serve runs requested by other invocations on the Unix socket PATH. Without --watch, have the process listening on PATH do the run, or do it locally if there's none.",
+    )
+    # pre-commit provides the staged files. When given, projects none of whose
+    # files are among them are skipped.
+    parser.add_argument("files", nargs="*", metavar="FILES")
     return parser
 
 
 class CliArgs(NamedTuple):
-    pyproject_config: pathlib.Path
-    pre_commit_config: pathlib.Path
-    uv_lock: pathlib.Path
+    projects: list[discovery.Project]
+    jobs: int | None = None
+    verbose: bool = False
+    cache_dir: pathlib.Path | None = None
+    files: list[pathlib.Path] | None = None
+    profile: bool = False
+    profile_json: pathlib.Path | None = None
+    check: bool = False
+    watch: bool = False
+    interval: float = 0.5
+    socket: pathlib.Path | None = None
 
 
 def default_path(sibling: pathlib.Path, name: str) -> pathlib.Path:
@@ -63,34 +185,328 @@ def parse_cli(argv: list[str]) -> CliArgs:
     parser = get_parser()
     args = parser.parse_args(argv)
 
-    if not args.pre_commit_config:
-        args.pre_commit_config = default_path(
-            sibling=args.pyproject_config, name=".pre-commit-config.yaml"
+    if isinstance(args.pyproject_config, list):
+        pyproject_configs = args.pyproject_config
+    elif args.discover:
+        # The default pyproject.toml is only used when nothing else was asked
+        pyproject_configs = []
+    else:
+        pyproject_configs = [args.pyproject_config]
+
+    several_projects = len(pyproject_configs) > 1 or args.discover
+    if several_projects and (args.pre_commit_config or args.uv_lock):
+        parser.error(
+            "--pre-commit-config and --uv-lock can only be used with a single project."
         )
 
-    if not args.uv_lock:
-        args.uv_lock = default_path(sibling=args.pyproject_config, name="uv.lock")
+    projects = [
+        discovery.Project(
+            pyproject_config=pyproject_config,
+            pre_commit_config=args.pre_commit_config
+            or default_path(sibling=pyproject_config, name=".pre-commit-config.yaml"),
+            uv_lock=args.uv_lock
+            or default_path(sibling=pyproject_config, name="uv.lock"),
+        )
+        for pyproject_config in pyproject_configs
+    ]
+    if args.discover:
+        projects.extend(discovery.discover_projects(args.discover))
 
     return CliArgs(
-        pyproject_config=args.pyproject_config,
-        pre_commit_config=args.pre_commit_config,
-        uv_lock=args.uv_lock,
+        projects=projects,
+        jobs=args.jobs,
+        verbose=args.verbose,
+        cache_dir=None
+        if args.no_cache
+        else args.cache_dir or cache.default_cache_dir(),
+        files=None
+        if args.always_run or not args.files
+        else [pathlib.Path(file) for file in args.files],
+        profile=args.profile,
+        profile_json=args.profile_json,
+        check=args.check,
+        watch=args.watch,
+        interval=args.interval,
+        socket=args.socket,
     )
 
 
+def encode_args(args: CliArgs) -> dict[str, Any]:
+    """
+    Return a JSON-serializable version of the arguments of a run, to be sent to
+    a process running with --watch --socket. Paths are made absolute, as that
+    process may run in another directory.
+    """
+
+    def encode_path(path: pathlib.Path | None) -> str | None:
+        return None if path is None else str(path.absolute())
+
+    return {
+        "projects": [
+            [encode_path(path) for path in project] for project in args.projects
+        ],
+        "jobs": args.jobs,
+        "verbose": args.verbose,
+        "cache_dir": encode_path(args.cache_dir),
+        "files": None
+        if args.files is None
+        else [encode_path(file) for file in args.files],
+        "profile": args.profile,
+        "profile_json": encode_path(args.profile_json),
+        "check": args.check,
+    }
+
+
+def decode_args(data: dict[str, Any]) -> CliArgs:
+    """Reverse of encode_args."""
+
+    def decode_path(path: str | None) -> pathlib.Path | None:
+        return None if path is None else pathlib.Path(path)
+
+    return CliArgs(
+        projects=[
+            discovery.Project(*(pathlib.Path(path) for path in project))
+            for project in data["projects"]
+        ],
+        jobs=data["jobs"],
+        verbose=data["verbose"],
+        cache_dir=decode_path(data["cache_dir"]),
+        files=None
+        if data["files"] is None
+        else [pathlib.Path(file) for file in data["files"]],
+        profile=data["profile"],
+        profile_json=decode_path(data["profile_json"]),
+        check=data["check"],
+    )
+
+
+def get_tool_version() -> str:
+    return stamp.get_tool_identity().hex()
+
+
+def get_relevant_projects(
+    projects: list[discovery.Project], files: list[pathlib.Path] | None
+) -> list[discovery.Project]:
+    """
+    Return the projects that have at least one file among `files`. Syncing the
+    other ones cannot produce a different result than last time.
+    If `files` is None, all projects are relevant.
+    """
+    if files is None:
+        return projects
+    resolved = {file.resolve() for file in files}
+    return [
+        project
+        for project in projects
+        if any(path.resolve() in resolved for path in project)
+    ]
+
+
+def get_stamp_kwargs(
+    cache_dir: pathlib.Path, project: discovery.Project
+) -> dict[str, Any]:
+    return {
+        "cache_dir": cache_dir,
+        "pre_commit_path": project.pre_commit_config,
+        "paths": list(project),
+    }
+
+
+class RunResult(NamedTuple):
+    # Lines to print, and the error to exit with, if any
+    output: list[str]
+    error: str | None = None
+
+
+def run(
+    args: CliArgs,
+    files: sync.FileContents | None = None,
+    export_cache: cache.ExportCacheProtocol | None = None,
+) -> RunResult:
+    """
+    Sync the projects, and return what should be reported.
+
+    `files` and `export_cache` may be provided to reuse what previous runs
+    computed (see watch_projects).
+    """
+    output: list[str] = []
+    try:
+        projects = get_relevant_projects(args.projects, args.files)
+        if not projects:
+            if args.verbose:
+                output.append("None of the project files changed.")
+            return RunResult(output=output)
+
+        cache_dir = args.cache_dir
+        projects = [
+            project
+            for project in projects
+            if not (
+                cache_dir
+                and stamp.is_up_to_date(**get_stamp_kwargs(cache_dir, project))
+            )
+        ]
+        if not projects:
+            if args.verbose:
+                output.append("Nothing changed since the last successful sync.")
+            return RunResult(output=output)
+
+        # Imported here so that the fast path above doesn't pay for packaging
+        # and ruamel.yaml.
+        from . import sync
+
+        if export_cache is None and cache_dir:
+            export_cache = cache.ExportCache(cache_dir)
+        profile = profiling.Profile()
+        results = sync.sync_many(
+            projects=projects,
+            jobs=args.jobs,
+            export_cache=export_cache,
+            profile=profile,
+            check=args.check,
+            files=files,
+            lock_index=cache.LockIndex(cache_dir) if cache_dir else None,
+        )
+    except exceptions.SyncPreCommitWithUvException as exc:
+        return RunResult(output=output, error=str(exc))
+
+    if args.profile:
+        output.append(profile.report())
+    if args.profile_json:
+        profile.write_json(args.profile_json)
+
+    # Only prefix messages with the project when there may be several
+    several_projects = len(args.projects) > 1
+    errors = []
+    for result in results:
+        prefix = f"{result.project.pyproject_config}: " if several_projects else ""
+        if result.error:
+            errors.append(f"{prefix}{result.error}")
+            continue
+        if args.check and result.summary and result.summary.updates:
+            errors.append(
+                f"{prefix}{result.project.pre_commit_config} is not in sync "
+                f"({result.summary.updates} update(s) needed)"
+            )
+            continue
+        if cache_dir:
+            stamp.write_stamp(**get_stamp_kwargs(cache_dir, result.project))
+        if args.verbose:
+            output.append(f"{prefix}{result.summary}")
+    return RunResult(output=output, error="\n".join(errors) or None)
+
+
+def watch_projects(args: CliArgs) -> None:
+    """
+    Sync the projects, then sync them again whenever one of their files changes,
+    until interrupted. The parsed files and the uv export results stay in memory
+    between syncs, so only what changed is computed again.
+
+    If `args.socket` is provided, runs requested by other invocations (see
+    --socket) are served in between, with the same state.
+
+    Errors are reported, and the projects are synced again on the next change.
+    """
+    from . import sync
+
+    files = sync.FileContents()
+    export_cache = cache.MemoryExportCache(
+        backend=cache.ExportCache(args.cache_dir) if args.cache_dir else None
+    )
+    watcher = watch.Watcher()
+    # Files that changed, but the projects using them weren't synced since
+    pending: set[pathlib.Path] = set()
+
+    def sync_projects(run_args: CliArgs) -> RunResult:
+        watcher.add(path for project in run_args.projects for path in project)
+        changed = watcher.poll()
+        files.forget(changed)
+        pending.update(changed)
+        try:
+            result = run(run_args, files=files, export_cache=export_cache)
+        except Exception:
+            # run() reports the errors it expects. Anything else is reported
+            # too, rather than ending the process on the first bad save.
+            import traceback
+
+            result = RunResult(output=[], error=traceback.format_exc().rstrip())
+        # Our own writes to the pre-commit configurations are not changes to
+        # react to.
+        written = {project.pre_commit_config.resolve() for project in run_args.projects}
+        changed = watcher.poll()
+        files.forget(changed)
+        pending.update(changed - written)
+        return result
+
+    def report(result: RunResult) -> None:
+        for line in result.output:
+            print(line, flush=True)
+        if result.error:
+            print(result.error, file=sys.stderr, flush=True)
+
+    def handle_request(payload: dict[str, Any]) -> dict[str, Any]:
+        # A client from another version of the tool does the run itself
+        if payload.get("tool") != get_tool_version():
+            return {}
+        return sync_projects(decode_args(payload["args"]))._asdict()
+
+    # All the files of the projects are watched, not just the staged ones
+    args = args._replace(files=None)
+    report(sync_projects(args))
+    pending.clear()
+    with contextlib.ExitStack() as stack:
+        server = None
+        if args.socket:
+            from . import daemon
+
+            server = stack.enter_context(
+                daemon.serve(args.socket, handle_request, timeout=args.interval)
+            )
+        while True:
+            if server:
+                server.handle_request()
+            else:
+                time.sleep(args.interval)
+            pending.update(watcher.poll())
+            if not pending:
+                continue
+            files.forget(pending)
+            projects = [
+                project
+                for project in args.projects
+                if any(path.resolve() in pending for path in project)
+            ]
+            pending.clear()
+            if projects:
+                report(sync_projects(args._replace(projects=projects)))
+
+
 def cli(argv: list[str] | None = None) -> None:
     """Main entry point for the CLI."""
     argv = sys.argv[1:] if argv is None else argv
     try:
-        pyproject_config, pre_commit_config, uv_lock = parse_cli(argv)
-        sync.sync(
-            pyproject_path=pyproject_config,
-            pre_commit_path=pre_commit_config,
-            uv_lock_path=uv_lock,
-        )
+        args = parse_cli(argv)
+        if args.watch:
+            with contextlib.suppress(KeyboardInterrupt):
+                watch_projects(args)
+            return
     except exceptions.SyncPreCommitWithUvException as exc:
         sys.exit(str(exc))
 
+    answer = None
+    if args.socket:
+        # Only needed with --socket, and importing socket isn't free
+        from . import daemon
+
+        answer = daemon.request(
+            args.socket, {"tool": get_tool_version(), "args": encode_args(args)}
+        )
+    result = RunResult(**answer) if answer else run(args)
+    for line in result.output:
+        print(line)
+    if result.error:
+        sys.exit(result.error)
+
 
 if __name__ == "__main__":
     cli()
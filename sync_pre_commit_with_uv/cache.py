@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import pathlib
+import shutil
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, ClassVar, Protocol
+
+if TYPE_CHECKING:
+    from . import lock
+
+# This module is imported on every run, including the ones that exit early, so
+# modules only needed when actually reading or writing entries are imported lazily.
+
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  # 30 days, in seconds
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024  # 10 MiB
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_LOCK_INDEX_MAX_SIZE = 32 * 1024 * 1024  # 32 MiB
+DEFAULT_LOCK_INDEX_MAX_ENTRIES = 16
+
+# Bumped whenever what lock.parse_lock returns changes
+LOCK_INDEX_FORMAT = "1"
+
+
+def default_cache_dir() -> pathlib.Path:
+    """
+    Return the default cache directory, following the XDG base directory
+    specification.
+    """
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = (
+        pathlib.Path(xdg_cache_home)
+        if xdg_cache_home
+        else pathlib.Path.home() / ".cache"
+    )
+    return base / "sync-pre-commit-with-uv"
+
+
+def get_uv_identity() -> str:
+    """
+    Return a string identifying the uv executable that will be called.
+    Running `uv --version` would cost a subprocess, so we rely on the resolved
+    path of the executable and its stat instead: they change when uv is upgraded.
+    """
+    path = shutil.which("uv")
+    if path is None:
+        return ""
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def hash_parts(parts: Iterable[bytes]) -> str:
+    """
+    Hash a sequence of byte strings, in a way that doesn't depend on where
+    the boundaries between parts are.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ExportCacheProtocol(Protocol):
+    def get(self, key: str) -> list[str] | None: ...
+
+    def set(self, key: str, value: list[str]) -> None: ...
+
+    def evict(self) -> None: ...
+
+
+class FileCache:
+    """
+    Base class for on-disk caches: entries are files in a subdirectory of the
+    cache directory, named after the hash of everything they depend on.
+
+    The cache is best-effort: any error reading or writing is ignored.
+    """
+
+    subdirectory: ClassVar[str]
+    suffix: ClassVar[str]
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_size: int = DEFAULT_MAX_SIZE,
+    ) -> None:
+        self.directory = directory / self.subdirectory
+        self.max_age = max_age
+        self.max_size = max_size
+
+    def path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def read(self, key: str) -> bytes | None:
+        path = self.path(key)
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        # Refresh the entry so that eviction is least-recently-used
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return content
+
+    def write(self, key: str, content: bytes) -> None:
+        import tempfile
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so that concurrent readers never see a partial file
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=self.directory, suffix=".tmp", delete=False
+            ) as file:
+                file.write(content)
+            os.replace(file.name, self.path(key))
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """
+        Remove entries older than max_age, then the least recently used entries
+        until the cache is smaller than max_size.
+        """
+        try:
+            paths = list(self.directory.glob(f"*{self.suffix}"))
+        except OSError:
+            return
+        entries: list[tuple[os.stat_result, pathlib.Path]] = []
+        for path in paths:
+            with contextlib.suppress(OSError):
+                entries.append((path.stat(), path))
+
+        now = time.time()
+        total_size = 0
+        # Most recently used first
+        for stat, path in sorted(entries, key=lambda e: e[0].st_mtime, reverse=True):
+            too_old = now - stat.st_mtime > self.max_age
+            too_big = total_size + stat.st_size > self.max_size
+            if too_old or too_big:
+                with contextlib.suppress(OSError):
+                    path.unlink()
+                continue
+            total_size += stat.st_size
+
+
+class ExportCache(FileCache):
+    """
+    On-disk cache of uv export results. Entries are JSON files, named after the
+    hash of everything that may influence the result of the export.
+    """
+
+    subdirectory = "exports"
+    suffix = ".json"
+
+    def get(self, key: str) -> list[str] | None:
+        import json
+
+        content = self.read(key)
+        if content is None:
+            return None
+        try:
+            value = json.loads(content)
+        except ValueError:
+            return None
+        if not isinstance(value, list):
+            return None
+        return [str(line) for line in value]
+
+    def set(self, key: str, value: list[str]) -> None:
+        import json
+
+        self.write(key, json.dumps(value).encode())
+
+
+class LockIndexProtocol(Protocol):
+    def parse(self, text: str) -> dict[str, Any]: ...
+
+    def get_package_table(self, text: str) -> lock.PackageTable: ...
+
+    def evict(self) -> None: ...
+
+
+class LockIndex(FileCache):
+    """
+    On-disk cache of parsed uv.lock files, named after the hash of their
+    contents: a changed uv.lock gets a new entry, and the old one is eventually
+    evicted. Entries are stored with marshal, which loads an order of magnitude
+    faster than parsing the TOML again, but whose format may change between
+    Python versions, so the version is part of the key.
+    """
+
+    subdirectory = "locks"
+    suffix = ".marshal"
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_size: int = DEFAULT_LOCK_INDEX_MAX_SIZE,
+    ) -> None:
+        super().__init__(directory, max_age=max_age, max_size=max_size)
+
+    def get_key(self, text: str) -> str:
+        import marshal
+        import sys
+
+        return hash_parts(
+            [
+                LOCK_INDEX_FORMAT.encode(),
+                f"{sys.version}:{marshal.version}".encode(),
+                text.encode(),
+            ]
+        )
+
+    def parse(self, text: str) -> dict[str, Any]:
+        """
+        Return the uv.lock file with the given contents, as parsed by
+        lock.parse_lock, from the cache if possible.
+        """
+        import marshal
+
+        from . import lock
+
+        key = self.get_key(text)
+        content = self.read(key)
+        if content is not None:
+            try:
+                value = marshal.loads(content)
+            except (EOFError, ValueError, TypeError):
+                value = None
+            if isinstance(value, dict):
+                return value
+        value = lock.parse_lock(text)
+        self.write(key, marshal.dumps(value))
+        return value
+
+    def get_package_table(self, text: str) -> lock.PackageTable:
+        """
+        Return the table of package versions of the uv.lock file with the given
+        contents. Building it only takes a scan of the file, so it isn't stored.
+        """
+        from . import lock
+
+        return lock.PackageTable.from_text(text)
+
+
+class MemoryExportCache:
+    """
+    In-memory cache of uv export results, for long-running processes (see
+    --watch). Misses are read from `backend` if provided, and new entries are
+    written to it too. Only the `max_entries` most recently used entries are kept
+    in memory.
+    """
+
+    def __init__(
+        self,
+        backend: ExportCacheProtocol | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.backend = backend
+        self.max_entries = max_entries
+        self.entries: dict[str, list[str]] = {}
+
+    def get(self, key: str) -> list[str] | None:
+        value = self.entries.pop(key, None)
+        if value is None and self.backend:
+            value = self.backend.get(key)
+        if value is not None:
+            # Re-inserted last, so that dict order is least-recently-used first
+            self.entries[key] = value
+        return value
+
+    def set(self, key: str, value: list[str]) -> None:
+        self.entries.pop(key, None)
+        self.entries[key] = value
+        if self.backend:
+            self.backend.set(key, value)
+
+    def evict(self) -> None:
+        for key in list(self.entries)[: -self.max_entries or None]:
+            del self.entries[key]
+        if self.backend:
+            self.backend.evict()
+
+
+class MemoryLockIndex:
+    """
+    In-memory cache of parsed uv.lock files and of their tables of package
+    versions, keyed on their contents, for processes syncing many projects (see
+    sync.plan). Misses are read from `backend` if provided. Only the
+    `max_entries` most recently used entries of each kind are kept in memory.
+    """
+
+    def __init__(
+        self,
+        backend: LockIndexProtocol | None = None,
+        max_entries: int = DEFAULT_LOCK_INDEX_MAX_ENTRIES,
+    ) -> None:
+        self.backend = backend
+        self.max_entries = max_entries
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.package_tables: dict[str, lock.PackageTable] = {}
+
+    def parse(self, text: str) -> dict[str, Any]:
+        key = hash_parts([text.encode()])
+        value = self.entries.pop(key, None)
+        if value is None:
+            if self.backend:
+                value = self.backend.parse(text)
+            else:
+                from . import lock
+
+                value = lock.parse_lock(text)
+        # Re-inserted last, so that dict order is least-recently-used first
+        self.entries[key] = value
+        return value
+
+    def get_package_table(self, text: str) -> lock.PackageTable:
+        key = hash_parts([text.encode()])
+        value = self.package_tables.pop(key, None)
+        if value is None:
+            if self.backend:
+                value = self.backend.get_package_table(text)
+            else:
+                from . import lock
+
+                value = lock.PackageTable.from_text(text)
+        self.package_tables[key] = value
+        return value
+
+    def evict(self) -> None:
+        for entries in (self.entries, self.package_tables):
+            for key in list(entries)[: -self.max_entries or None]:
+                del entries[key]
+        if self.backend:
+            self.backend.evict()
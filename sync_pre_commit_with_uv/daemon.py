@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import socket
+import stat
+from collections.abc import Generator
+from typing import Any, Callable
+
+from . import exceptions
+
+# Transport between the CLI and a process running with --watch --socket: the
+# client sends one JSON object, and the server answers with one JSON object.
+# The CLI only imports this module when given --socket, before deciding whether
+# to do any actual work, so it only uses the standard library, and the client
+# side doesn't import socketserver, nor json unless a server is listening.
+
+Handler = Callable[[dict[str, Any]], dict[str, Any]]
+
+
+def connect(socket_path: pathlib.Path) -> socket.socket | None:
+    """Return a socket connected to the server, None if there's none."""
+    if not hasattr(socket, "AF_UNIX"):  # coverage: exclude
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def request(
+    socket_path: pathlib.Path, payload: dict[str, Any]
+) -> dict[str, Any] | None:
+    """
+    Send the payload to the server listening on `socket_path`, and return its
+    answer. Returns None if no server answered, in which case the caller should
+    do the work itself.
+    """
+    client = connect(socket_path)
+    if client is None:
+        return None
+    import json
+
+    with client, client.makefile("rwb") as file:
+        try:
+            file.write(json.dumps(payload).encode() + b"\n")
+            file.flush()
+            client.shutdown(socket.SHUT_WR)
+            answer = json.loads(file.read())
+        except (OSError, ValueError):
+            return None
+    return answer if isinstance(answer, dict) else None
+
+
+@contextlib.contextmanager
+def serve(
+    socket_path: pathlib.Path, handler: Handler, timeout: float | None = None
+) -> Generator[Any, None, None]:
+    """
+    Context manager listening on `socket_path` and yielding the server: each call
+    to its handle_request() method waits for up to `timeout` seconds for a
+    request, and answers it with `handler`. Requests are handled one at a time,
+    in the calling thread.
+    """
+    import json
+    import socketserver
+
+    client = connect(socket_path)
+    if client is not None:
+        client.close()
+        raise exceptions.DaemonAlreadyRunning(path=socket_path)
+    # Left over by a server that didn't exit cleanly. Anything else at that path
+    # isn't ours to remove.
+    with contextlib.suppress(FileNotFoundError):
+        if not stat.S_ISSOCK(os.lstat(socket_path).st_mode):
+            raise exceptions.NotASocket(path=socket_path)
+        socket_path.unlink()
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            try:
+                payload = json.loads(self.rfile.read())
+            except ValueError:
+                return
+            self.wfile.write(json.dumps(handler(payload)).encode())
+
+    # Only the owner may connect: the socket is created with the right mode,
+    # rather than restricted after the fact.
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(socket_path), RequestHandler)
+    finally:
+        os.umask(umask)
+    server.timeout = timeout
+    created = os.lstat(socket_path)
+    try:
+        with server:
+            yield server
+    finally:
+        # Don't remove a socket that another server has created in the meantime
+        with contextlib.suppress(FileNotFoundError):
+            if os.path.samestat(os.lstat(socket_path), created):
+                socket_path.unlink()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+class Project(NamedTuple):
+    pyproject_config: pathlib.Path
+    pre_commit_config: pathlib.Path
+    uv_lock: pathlib.Path
+
+
+def find_uv_lock(directory: pathlib.Path, root: pathlib.Path) -> pathlib.Path | None:
+    """
+    Return the uv.lock file of the project in `directory`: either its own, or the
+    one of the uv workspace it belongs to, in a parent directory (up to `root`).
+    """
+    for parent in [directory, *directory.parents]:
+        uv_lock = parent / "uv.lock"
+        if uv_lock.exists():
+            return uv_lock
+        if parent == root:
+            break
+    return None
+
+
+def discover_projects(root: pathlib.Path) -> Iterable[Project]:
+    """
+    Find all the projects under `root`: directories containing both a
+    pyproject.toml and a .pre-commit-config.yaml file, and that have a uv.lock
+    file. Hidden directories (.git, .venv, ...) are skipped.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        if "pyproject.toml" not in filenames:
+            continue
+        if ".pre-commit-config.yaml" not in filenames:
+            continue
+        directory = pathlib.Path(dirpath)
+        uv_lock = find_uv_lock(directory, root=root)
+        if uv_lock is None:
+            continue
+        yield Project(
+            pyproject_config=directory / "pyproject.toml",
+            pre_commit_config=directory / ".pre-commit-config.yaml",
+            uv_lock=uv_lock,
+        )
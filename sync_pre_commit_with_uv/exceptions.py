@@ -25,3 +25,27 @@ class PackageNotFound(SyncPreCommitWithUvException):
 
 class PathDoesNotExist(SyncPreCommitWithUvException):
     """Path '{path}' does not exist."""
+
+
+class InvalidFile(SyncPreCommitWithUvException):
+    """Path '{path}' could not be parsed: {error}"""
+
+
+class SharedPreCommitConfig(SyncPreCommitWithUvException):
+    """Path '{path}' is the pre-commit configuration of several projects."""
+
+
+class DaemonAlreadyRunning(SyncPreCommitWithUvException):
+    """Another process is already listening on '{path}'."""
+
+
+class NotASocket(SyncPreCommitWithUvException):
+    """Path '{path}' exists and is not a socket."""
+
+
+class UvExportError(SyncPreCommitWithUvException):
+    """uv export {params} failed: {error}"""
+
+
+class ExportNotAvailable(SyncPreCommitWithUvException):
+    """uv export {params} can't be computed from uv.lock, and uv isn't available."""
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+import sys
+from collections.abc import Iterable
+from typing import Any
+
+import packaging.utils
+
+from . import toml
+
+# uv writes uv.lock in a very regular way: each package starts with a
+# `[[package]]` header, immediately followed by its name and (usually) its version.
+PACKAGE_HEADER = "[[package]]"
+# Keys of the package entries only needed to install the packages, which make up
+# most of uv.lock.
+INSTALL_KEYS = {"sdist", "wheels"}
+PACKAGE_START_RE = re.compile(r"^\[\[package\]\]$", re.MULTILINE)
+PACKAGE_RE = re.compile(
+    r'^\[\[package\]\]\nname = "([^"\\]*)"\n(?:version = "([^"\\]*)"\n)?',
+    re.MULTILINE,
+)
+
+
+def scan_package_versions(text: str) -> list[tuple[str, str]] | None:
+    """
+    Extract the (name, version) pairs of the packages in a uv.lock file without
+    parsing the whole TOML document. Packages without a version are skipped.
+
+    Returns None if the file isn't laid out the way uv writes it, in which case
+    the caller should fall back to a full TOML parse.
+    """
+    matches = PACKAGE_RE.findall(text)
+    # Every package header must have been matched, otherwise we'd silently
+    # miss packages.
+    if len(matches) != text.count(PACKAGE_HEADER):
+        return None
+    return [(name, version) for name, version in matches if version]
+
+
+def read_package_versions(text: str) -> list[tuple[str, str]]:
+    """
+    Extract the (name, version) pairs of the packages in a uv.lock file, using
+    the scanner when possible and a full TOML parse otherwise.
+    """
+    versions = scan_package_versions(text)
+    if versions is not None:
+        return versions
+    return [
+        (package["name"], package["version"])
+        for package in toml.parse_toml(text).get("package", [])
+        if "name" in package and "version" in package
+    ]
+
+
+class PackageTable:
+    """
+    Versions of the packages of a uv.lock file, by name. Only the interned names
+    and versions are kept, so nothing else of the file stays alive once the
+    table is built. For forked packages, the last version wins.
+
+    uv writes canonicalized names, so only the names we look up need to be
+    canonicalized.
+    """
+
+    __slots__ = ("versions",)
+
+    def __init__(self, versions: Iterable[tuple[str, str]]) -> None:
+        self.versions = {
+            sys.intern(name): sys.intern(version) for name, version in versions
+        }
+
+    @classmethod
+    def from_text(cls, text: str) -> PackageTable:
+        return cls(read_package_versions(text))
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def get(self, name: str) -> str | None:
+        """Return the version of the package, None if it's not in uv.lock."""
+        return self.versions.get(packaging.utils.canonicalize_name(name))
+
+
+def intern(value: Any) -> Any:
+    """
+    Return `value` with all its strings interned. The same names, versions and
+    markers appear many times in uv.lock: this way, they are stored once, both
+    in memory and when serialized with marshal.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(key): intern(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [intern(item) for item in value]
+    return value
+
+
+def parse_lock(text: str) -> dict[str, Any]:
+    """
+    Parse a uv.lock file, keeping only what's needed to compute exports (see
+    resolver.LockResolver).
+
+    When the file is laid out the way uv writes it, packages are parsed one at
+    a time, so that the whole TOML document is never in memory at once.
+    """
+    starts = [match.start() for match in PACKAGE_START_RE.finditer(text)]
+    if len(starts) != text.count(PACKAGE_HEADER):
+        config = toml.parse_toml(text)
+        packages = config.get("package", [])
+    else:
+        config = toml.parse_toml(text[: starts[0]] if starts else text)
+        packages = (
+            toml.parse_toml(text[start:end])["package"][0]
+            for start, end in zip(starts, [*starts[1:], len(text)])
+        )
+    config["package"] = [
+        {key: value for key, value in package.items() if key not in INSTALL_KEYS}
+        for package in packages
+    ]
+    return intern(config)
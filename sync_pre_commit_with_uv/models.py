@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, ClassVar, NamedTuple
+
+# Lightweight replacement for pydantic dataclasses. We only validate a few dozen
+# small dicts per run, and importing pydantic and building its schemas used to
+# take most of the runtime.
+
+
+class ValidationError(ValueError):
+    def __init__(self, model: str, errors: list[tuple[str, str, object]]) -> None:
+        self.errors = errors
+        lines = [f"{len(errors)} validation error(s) for {model}"]
+        for field, message, value in errors:
+            lines.append(field)
+            lines.append(f"  {message} [input_value={value!r}]")
+        super().__init__("\n".join(lines))
+
+
+class FieldError(ValueError):
+    pass
+
+
+Validator = Callable[[Any], Any]
+
+REQUIRED: Any = object()
+
+
+class Field(NamedTuple):
+    validate: Validator
+    default: Any = REQUIRED
+
+
+class Model:
+    """
+    Base class for models: subclasses declare their fields in `fields`, and
+    `__slots__` with the same names. Instances are built from keyword arguments,
+    each value being checked (and possibly converted) by the field's validator.
+    Unknown keyword arguments are ignored.
+    """
+
+    __slots__ = ()
+    fields: ClassVar[dict[str, Field]]
+
+    def __init__(self, **kwargs: Any) -> None:
+        errors: list[tuple[str, str, object]] = []
+        for name, field in self.fields.items():
+            if name not in kwargs:
+                if field.default is REQUIRED:
+                    errors.append((name, "Field required", kwargs))
+                    continue
+                value = field.default
+            else:
+                try:
+                    value = field.validate(kwargs[name])
+                except FieldError as exc:
+                    errors.append((name, str(exc), kwargs[name]))
+                    continue
+            setattr(self, name, value)
+        if errors:
+            raise ValidationError(model=type(self).__name__, errors=errors)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.fields)
+
+    __hash__ = None  # pyright: ignore[reportAssignmentType]
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields)
+        return f"{type(self).__name__}({args})"
+
+
+def string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise FieldError("Input should be a valid string")
+    return value
+
+
+def boolean(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise FieldError("Input should be a valid boolean")
+    return value
+
+
+def positive_int(value: Any) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise FieldError("Input should be a valid integer")
+    if value < 1:
+        raise FieldError("Input should be greater than 0")
+    return value
+
+
+def optional(validator: Validator) -> Validator:
+    def validate(value: Any) -> Any:
+        return None if value is None else validator(value)
+
+    return validate
+
+
+def list_of(validator: Validator) -> Validator:
+    def validate(value: Any) -> list[Any]:
+        if not isinstance(value, list):
+            raise FieldError("Input should be a valid list")
+        return [validator(item) for item in value]
+
+    return validate
+
+
+def dict_of(validator: Validator) -> Validator:
+    def validate(value: Any) -> dict[str, Any]:
+        if not isinstance(value, dict):
+            raise FieldError("Input should be a valid dictionary")
+        return {string(key): validator(item) for key, item in value.items()}
+
+    return validate
+
+
+def one_of(*validators: Validator) -> Validator:
+    def validate(value: Any) -> Any:
+        messages = []
+        for validator in validators:
+            try:
+                return validator(value)
+            except FieldError as exc:
+                messages.append(str(exc))
+        raise FieldError(" or ".join(messages))
+
+    return validate
+
+
+def model(model_class: type[Model]) -> Validator:
+    def validate(value: Any) -> Model:
+        if isinstance(value, model_class):
+            return value
+        if not isinstance(value, dict):
+            raise FieldError(f"Input should be a dictionary or {model_class.__name__}")
+        try:
+            return model_class(**value)
+        except ValidationError as exc:
+            raise FieldError(str(exc)) from exc
+
+    return validate
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import contextlib
+import pathlib
+import threading
+import time
+from collections.abc import Generator
+from typing import Any, NamedTuple
+
+# Like stamp, this module is imported by the CLI before deciding whether to do
+# any actual work, so it only uses the standard library.
+
+# Span names that have a special meaning in the report
+HOOK_EXPORT = "export"
+UV_EXPORT = "uv export"
+
+
+class Span(NamedTuple):
+    name: str
+    duration: float
+    labels: dict[str, str]
+
+
+class Profile:
+    """
+    Collects the duration of the phases of a run. Spans may be recorded from
+    several threads at once.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.spans: list[Span] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, **labels: str) -> Generator[None, None, None]:
+        """
+        Context manager (or decorator) recording the time spent in its block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                self.spans.append(Span(name=name, duration=duration, labels=labels))
+
+    def get_phases(self) -> dict[str, tuple[int, float]]:
+        """
+        Return the number of spans and their total duration, by name, in the order
+        they were first recorded.
+        """
+        phases: dict[str, tuple[int, float]] = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            count, total = phases.get(span.name, (0, 0.0))
+            phases[span.name] = (count + 1, total + span.duration)
+        return phases
+
+    def get_spans(self, name: str) -> list[Span]:
+        with self.lock:
+            return [span for span in self.spans if span.name == name]
+
+    def report(self) -> str:
+        """Return a human-readable breakdown of the run."""
+        lines = [f"{'Phase':<32} {'Count':>6} {'Total':>12}"]
+        for name, (count, total) in self.get_phases().items():
+            lines.append(f"{name:<32} {count:>6} {format_duration(total):>12}")
+        hook_spans = self.get_spans(HOOK_EXPORT)
+        if hook_spans:
+            lines.append("")
+            lines.append("Exports by hook:")
+            for span in hook_spans:
+                hook = f"{span.labels['repo']} {span.labels['hook_id']}"
+                lines.append(f"  {hook:<60} {format_duration(span.duration):>12}")
+        lines.append("")
+        lines.append(f"uv export subprocesses: {len(self.get_spans(UV_EXPORT))}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable version of the profile. Durations are in seconds."""
+        return {
+            "phases": {
+                name: {"count": count, "total": total}
+                for name, (count, total) in self.get_phases().items()
+            },
+            "hooks": [
+                {**span.labels, "duration": span.duration}
+                for span in self.get_spans(HOOK_EXPORT)
+            ],
+            "uv_export_calls": [
+                {**span.labels, "duration": span.duration}
+                for span in self.get_spans(UV_EXPORT)
+            ],
+        }
+
+    def write_json(self, path: pathlib.Path) -> None:
+        import json
+
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def format_duration(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import functools
+import json
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, NamedTuple
+
+import packaging.markers
+import packaging.utils
+
+# Computes what `uv export` would output, from the dependency graph of uv.lock.
+# Only the cases where the answer is unambiguous are handled: whenever a
+# parameter isn't understood, or the selection depends on markers (unless a
+# target environment is given) or on forked packages, we return None and the
+# caller should ask uv.
+
+GROUP_FLAGS = {"--group", "--only-group", "--no-group", "--extra"}
+BOOLEAN_FLAGS = {
+    "--all-groups",
+    "--all-extras",
+    "--no-default-groups",
+    "--no-dev",
+    "--only-dev",
+}
+
+
+Environment = tuple[tuple[str, str], ...]
+
+
+def freeze_environment(environment: dict[str, str]) -> Environment:
+    """Return a hashable version of a marker environment."""
+    return tuple(sorted(environment.items()))
+
+
+@functools.cache
+def evaluate_marker(marker: str, environment: Environment) -> bool | None:
+    """
+    Evaluate a PEP 508 marker in the given environment, missing variables taking
+    the value of the running interpreter. Returns None if it can't be evaluated.
+    The same markers appear on many edges of the lock graph, so results are
+    cached.
+    """
+    if "extra" in marker:
+        # uv encodes conflicting extras and groups as `extra` markers: they
+        # depend on the selection, not on the environment.
+        return None
+    try:
+        return packaging.markers.Marker(marker).evaluate(dict(environment))
+    except (
+        packaging.markers.InvalidMarker,
+        packaging.markers.UndefinedComparison,
+        packaging.markers.UndefinedEnvironmentName,
+    ):
+        return None
+
+
+def is_supported(params: Sequence[str]) -> bool:
+    """
+    Return whether the normalized uv export parameters only use flags we
+    understand. Doesn't need uv.lock, so it's cheap to check before loading it.
+    """
+    iterator = iter(params)
+    for param in iterator:
+        if param in GROUP_FLAGS:
+            if next(iterator, None) is None:
+                return False
+        elif param not in BOOLEAN_FLAGS:
+            return False
+    return True
+
+
+class Selection(NamedTuple):
+    """What a set of `uv export` parameters selects in the project."""
+
+    project: bool
+    groups: set[str]
+    extras: set[str]
+
+
+def parse_selection(
+    params: Sequence[str],
+    *,
+    default_groups: list[str] | None,
+    available_groups: set[str],
+    available_extras: set[str],
+) -> Selection | None:
+    """
+    Interpret normalized uv export parameters (see sync.normalize_uv_params).
+    `default_groups` is the `tool.uv.default-groups` setting, None meaning all
+    groups. Returns None for anything we don't support, or that uv would reject.
+    """
+    values: dict[str, set[str]] = {flag: set() for flag in GROUP_FLAGS}
+    flags: set[str] = set()
+    iterator = iter(params)
+    for param in iterator:
+        if param in GROUP_FLAGS:
+            value = next(iterator, None)
+            if value is None:
+                return None
+            values[param].add(value)
+        elif param in BOOLEAN_FLAGS:
+            flags.add(param)
+        else:
+            return None
+
+    only_groups = values["--only-group"]
+    if "--only-dev" in flags:
+        only_groups.add("dev")
+    requested_groups = only_groups | values["--group"] | values["--no-group"]
+    if not requested_groups <= available_groups:
+        return None
+    if not values["--extra"] <= available_extras:
+        return None
+
+    if only_groups:
+        # uv refuses to mix those
+        if values["--group"] or values["--extra"] or flags - {"--only-dev"}:
+            return None
+        return Selection(
+            project=False, groups=only_groups - values["--no-group"], extras=set()
+        )
+
+    groups = set(values["--group"])
+    if "--all-groups" in flags:
+        groups = available_groups
+    elif "--no-default-groups" not in flags:
+        # Default groups that don't exist are ignored
+        groups |= available_groups & (
+            available_groups if default_groups is None else set(default_groups)
+        )
+    groups = groups - values["--no-group"]
+    if "--no-dev" in flags:
+        groups = groups - {"dev"}
+    return Selection(
+        project=True,
+        groups=groups,
+        extras=available_extras if "--all-extras" in flags else values["--extra"],
+    )
+
+
+class LockResolver:
+    """
+    Compute the packages `uv export` would output, for the project described by
+    `pyproject_config`, from the parsed uv.lock returned by `load_lock`. The lock
+    is only loaded when first needed.
+
+    If a target `environment` is given, conditional dependencies are only kept
+    if their marker matches it.
+    """
+
+    def __init__(
+        self,
+        *,
+        pyproject_config: dict[str, Any],
+        load_lock: Callable[[], dict[str, Any]],
+        environment: dict[str, str] | None = None,
+    ) -> None:
+        self.pyproject_config = pyproject_config
+        self.load_lock = load_lock
+        self.environment = (
+            None if environment is None else freeze_environment(environment)
+        )
+        # Closures are shared between all the exports selecting the same groups
+        # or extras.
+        self.closures: dict[tuple[str, str], frozenset[str] | None] = {}
+        self.exports: dict[tuple[str, ...], list[str] | None] = {}
+
+    @functools.cached_property
+    def lock(self) -> dict[str, Any]:
+        return self.load_lock()
+
+    @functools.cached_property
+    def packages(self) -> dict[str, list[dict[str, Any]]]:
+        """Packages of uv.lock, by name. Forked packages have several entries."""
+        packages: dict[str, list[dict[str, Any]]] = {}
+        for package in self.lock.get("package", []):
+            packages.setdefault(package["name"], []).append(package)
+        return packages
+
+    def get_package(self, name: str) -> dict[str, Any] | None:
+        """Return the package named `name`, if it's unambiguous."""
+        candidates = self.packages.get(name, [])
+        return candidates[0] if len(candidates) == 1 else None
+
+    @property
+    def default_groups(self) -> list[str] | None:
+        """The groups selected by default, None meaning all of them."""
+        uv_config = self.pyproject_config.get("tool", {}).get("uv", {})
+        default_groups = uv_config.get("default-groups", ["dev"])
+        return None if default_groups == "all" else default_groups
+
+    @property
+    def project_name(self) -> str | None:
+        name = self.pyproject_config.get("project", {}).get("name")
+        return packaging.utils.canonicalize_name(name) if name else None
+
+    def get_roots(
+        self, params: Sequence[str]
+    ) -> list[tuple[tuple[str, str], list[dict[str, Any]]]] | None:
+        """
+        Return the uv.lock dependency entries selected by the given normalized uv
+        export parameters, by project, group or extra (see `closures`). Returns
+        None if the parameters aren't supported.
+        """
+        if not self.project_name:
+            # Virtual workspace root: uv would export all the members.
+            return None
+        if not is_supported(params):
+            # Without loading uv.lock
+            return None
+        project = self.get_package(self.project_name)
+        if project is None:
+            return None
+        groups = project.get("dev-dependencies", {})
+        extras = project.get("optional-dependencies", {})
+        selection = parse_selection(
+            params,
+            default_groups=self.default_groups,
+            available_groups=set(groups),
+            available_extras=set(extras),
+        )
+        if selection is None:
+            return None
+
+        roots: list[tuple[tuple[str, str], list[dict[str, Any]]]] = []
+        if selection.project:
+            roots.append((("project", ""), project.get("dependencies", [])))
+            roots.extend(
+                (("extra", extra), extras[extra]) for extra in selection.extras
+            )
+        roots.extend((("group", group), groups[group]) for group in selection.groups)
+        return roots
+
+    def get_package_names(self, params: Sequence[str]) -> set[str] | None:
+        """
+        Return the names of the packages selected by the given normalized uv
+        export parameters, excluding the project and workspace members (like
+        `uv export --no-emit-project --no-emit-workspace`). Returns None if that
+        can't be determined safely.
+        """
+        roots = self.get_roots(params)
+        if roots is None:
+            return None
+        names: set[str] = set()
+        for key, dependencies in roots:
+            if key not in self.closures:
+                closure = self.get_closure(dependencies)
+                self.closures[key] = None if closure is None else frozenset(closure)
+            closure = self.closures[key]
+            if closure is None:
+                return None
+            names |= closure
+
+        names -= {self.project_name, *self.lock.get("manifest", {}).get("members", [])}
+        for name in names:
+            # Only registry packages are exported as plain `name==version` lines
+            if "registry" not in self.packages[name][0].get("source", {}):
+                return None
+        return names
+
+    def get_footprint(self, params: Sequence[str]) -> str | None:
+        """
+        Return a serialization of everything in uv.lock that the output of
+        `uv export` with the given normalized parameters may depend on, or None if
+        the parameters aren't supported. Unlike `export`, this handles forks and
+        markers, by including all the variants of packages and all the
+        conditional dependencies: this is an over-approximation.
+        """
+        roots = self.get_roots(params)
+        if roots is None:
+            return None
+        header = {key: value for key, value in self.lock.items() if key != "package"}
+        entries = list(self.packages[self.project_name or ""])
+        seen: set[str] = set()
+        stack = [dependency for _, dependencies in roots for dependency in dependencies]
+        while stack:
+            name = stack.pop()["name"]
+            if name in seen:
+                continue
+            seen.add(name)
+            for package in self.packages.get(name, []):
+                entries.append(package)
+                stack.extend(package.get("dependencies", []))
+                for dependencies in package.get("optional-dependencies", {}).values():
+                    stack.extend(dependencies)
+        return json.dumps([header, *entries], sort_keys=True, default=str)
+
+    def export(self, params: Sequence[str]) -> list[str] | None:
+        """
+        Return the lines `uv export` would output for the given normalized
+        parameters (with the options used by sync.uv_export), or None if that
+        can't be determined safely.
+        """
+        params = tuple(params)
+        if params not in self.exports:
+            names = self.get_package_names(params)
+            self.exports[params] = (
+                None
+                if names is None
+                else [
+                    f"{name}=={self.packages[name][0]['version']}"
+                    for name in sorted(names)
+                ]
+            )
+        return self.exports[params]
+
+    def get_closure(self, dependencies: Iterable[dict[str, Any]]) -> set[str] | None:
+        """
+        Return the names of all the packages needed by the given uv.lock
+        dependency entries, or None if any of them is forked, or conditional
+        without a target environment.
+        """
+        names: set[str] = set()
+        seen: set[tuple[str, str | None]] = set()
+        stack = list(dependencies)
+        while stack:
+            dependency = stack.pop()
+            if "marker" in dependency:
+                if self.environment is None:
+                    return None
+                matches = evaluate_marker(dependency["marker"], self.environment)
+                if matches is None:
+                    return None
+                if not matches:
+                    continue
+            name = dependency["name"]
+            package = self.get_package(name)
+            if package is None:
+                return None
+            names.add(name)
+            for extra in [None, *dependency.get("extra", [])]:
+                if (name, extra) in seen:
+                    continue
+                seen.add((name, extra))
+                if extra is None:
+                    stack.extend(package.get("dependencies", []))
+                else:
+                    stack.extend(
+                        package.get("optional-dependencies", {}).get(extra, [])
+                    )
+        return names
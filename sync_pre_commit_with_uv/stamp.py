@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import pathlib
+from collections.abc import Iterable
+
+from . import cache
+
+# This module is used before deciding whether to do any actual work, so it must
+# stay cheap to import: standard library only (no ruamel.yaml, no packaging), and
+# no importlib.metadata.
+
+
+def get_tool_identity() -> bytes:
+    """
+    Return a value that changes whenever this tool is upgraded. Reading the
+    version through importlib.metadata would cost more than the whole fast path,
+    so we hash the source of the package instead.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(pathlib.Path(__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def compute_stamp(paths: Iterable[pathlib.Path]) -> str:
+    """
+    Compute a stamp from the contents of the given files, the tool and the uv
+    executable.
+    """
+    parts = [get_tool_identity(), cache.get_uv_identity().encode()]
+    for path in paths:
+        parts.append(str(path.resolve()).encode())
+        parts.append(path.read_bytes())
+    return cache.hash_parts(parts)
+
+
+def get_stamp_path(
+    cache_dir: pathlib.Path, pre_commit_path: pathlib.Path
+) -> pathlib.Path:
+    """
+    Return the path of the stamp file for a given pre-commit configuration file.
+    """
+    name = hashlib.sha256(str(pre_commit_path.resolve()).encode()).hexdigest()
+    return cache_dir / "stamps" / name
+
+
+def is_up_to_date(
+    *, cache_dir: pathlib.Path, pre_commit_path: pathlib.Path, paths: list[pathlib.Path]
+) -> bool:
+    """
+    Return True if the files haven't changed since the last successful sync.
+    """
+    try:
+        stamp = get_stamp_path(cache_dir, pre_commit_path).read_text()
+        return stamp == compute_stamp(paths)
+    except OSError:
+        return False
+
+
+def write_stamp(
+    *, cache_dir: pathlib.Path, pre_commit_path: pathlib.Path, paths: list[pathlib.Path]
+) -> None:
+    """
+    Record the state of the files after a successful sync. Syncing is idempotent,
+    so as long as the files keep this exact content, there's nothing to do.
+    """
+    with contextlib.suppress(OSError):
+        path = get_stamp_path(cache_dir, pre_commit_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(compute_stamp(paths))
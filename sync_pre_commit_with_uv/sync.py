@@ -1,26 +1,104 @@
+# The fields of the models.Model subclasses below are set by Model.__init__ through
+# setattr, which pyright can't follow.
+# pyright: reportUninitializedInstanceVariable=false
 from __future__ import annotations
 
+import concurrent.futures
 import contextlib
-import copy
+import dataclasses
+import functools
+import io
 import pathlib
+import re
 import subprocess
-from collections.abc import Generator, Iterable
-from typing import Any, NamedTuple, Protocol, cast
+import threading
+from collections.abc import Callable, Generator, Hashable, Iterable
+from typing import Any, ClassVar, NamedTuple, Protocol, TypeVar, cast
 
 import packaging.utils
-import pydantic
 import ruamel.yaml
 
-from . import exceptions, toml
+from . import (
+    cache,
+    discovery,
+    exceptions,
+    lock,
+    models,
+    profiling,
+    resolver,
+    toml,
+    yaml_patch,
+)
 
+T = TypeVar("T")
 
-@pydantic.dataclasses.dataclass(kw_only=True)
-class PyProjectRepoConfig:
+
+def get_tool_config(pyproject_config: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return the 'tool.sync-pre-commit-with-uv' section of a pyproject.toml file.
+    """
+    return pyproject_config.get("tool", {}).get("sync-pre-commit-with-uv", {})
+
+
+class ToolSettings(models.Model):
+    jobs: int | None
+    environment: dict[str, str] | None
+
+    fields: ClassVar[dict[str, models.Field]] = {
+        "jobs": models.Field(models.optional(models.positive_int), None),
+        "environment": models.Field(
+            models.optional(models.dict_of(models.string)), None
+        ),
+    }
+    __slots__ = tuple(fields)
+
+    @classmethod
+    def from_pyproject_config(cls, pyproject_config: dict[str, Any]) -> ToolSettings:
+        """
+        Create a ToolSettings instance from the reserved keys of the
+        'tool.sync-pre-commit-with-uv' section of a pyproject.toml file.
+        """
+        tool_config = get_tool_config(pyproject_config)
+        try:
+            return cls(
+                **{
+                    key: value
+                    for key, value in tool_config.items()
+                    if key in SETTINGS_KEYS
+                }
+            )
+        except models.ValidationError as exc:
+            raise exceptions.PyProjectConfigurationError(error=str(exc)) from exc
+
+
+# Keys of the 'tool.sync-pre-commit-with-uv' section that configure the tool itself
+# rather than a pre-commit repository.
+SETTINGS_KEYS = frozenset(ToolSettings.fields)
+
+
+class PyProjectRepoConfig(models.Model):
     repo_name: str
-    pypi_package_name: str | None = None
-    sync_revision: bool = True
-    fail_if_not_found: bool = True
-    additional_dependencies_uv_params: dict[str, list[str]] | list[str] | None = None
+    pypi_package_name: str | None
+    sync_revision: bool
+    fail_if_not_found: bool
+    additional_dependencies_uv_params: dict[str, list[str]] | list[str] | None
+
+    fields: ClassVar[dict[str, models.Field]] = {
+        "repo_name": models.Field(models.string),
+        "pypi_package_name": models.Field(models.optional(models.string), None),
+        "sync_revision": models.Field(models.boolean, True),
+        "fail_if_not_found": models.Field(models.boolean, True),
+        "additional_dependencies_uv_params": models.Field(
+            models.optional(
+                models.one_of(
+                    models.dict_of(models.list_of(models.string)),
+                    models.list_of(models.string),
+                )
+            ),
+            None,
+        ),
+    }
+    __slots__ = tuple(fields)
 
     @classmethod
     def from_pyproject_config(
@@ -30,12 +108,12 @@ class PyProjectRepoConfig:
         Create PyProjectRepoConfig instances from the 'tool.sync-pre-commit-with-uv' section
         of a pyproject.toml file.
         """
-        for key, value in (
-            pyproject_config.get("tool", {}).get("sync-pre-commit-with-uv", {}).items()
-        ):
+        for key, value in get_tool_config(pyproject_config).items():
+            if key in SETTINGS_KEYS:
+                continue
             try:
                 yield cls(repo_name=key, **value)
-            except pydantic.ValidationError as exc:
+            except models.ValidationError as exc:
                 raise exceptions.PyProjectConfigurationError(error=str(exc)) from exc
 
     @property
@@ -53,51 +131,121 @@ class PyProjectRepoConfig:
         )
 
 
+class PreCommitIndex:
+    """
+    Index of the repos and hooks of a pre-commit configuration, so that updates
+    can find their targets without scanning the whole configuration. The same
+    repo URL may appear several times (e.g. pinned at different revs), so repos
+    are identified by their position in the 'repos' list. A repo may list the
+    same hook several times, so each hook key maps to a list of nodes.
+    """
+
+    def __init__(self, pre_commit_config: dict[str, Any]) -> None:
+        self.repos: list[dict[str, Any]] = pre_commit_config.get("repos", [])
+        self.hooks: dict[tuple[int, str], list[dict[str, Any]]] = {}
+        for position, repo in enumerate(self.repos):
+            for hook in repo.get("hooks", []):
+                self.hooks.setdefault((position, hook["id"]), []).append(hook)
+
+    def get_repo(self, position: int, url: str) -> dict[str, Any] | None:
+        """Return the repo at `position`, if it's still the one for `url`."""
+        if position < len(self.repos) and self.repos[position].get("repo") == url:
+            return self.repos[position]
+        return None
+
+
 class UpdateProtocol(Protocol):
-    def apply(self, pre_commit_config: dict[str, Any]) -> None: ...
+    def apply(self, index: PreCommitIndex) -> bool:
+        """Apply the update, return whether anything changed."""
+        ...
 
+    def patch(self, index: yaml_patch.NodeIndex) -> list[yaml_patch.Edit] | None:
+        """
+        Return the edits applying the update to the text of the document, or
+        None if it can't be done with text edits.
+        """
+        ...
 
-@pydantic.dataclasses.dataclass(kw_only=True)
+
+@dataclasses.dataclass
 class UpdateRev:
     repo: str
+    # Position of the repo in the 'repos' list (see PreCommitIndex)
+    position: int
     value: str
 
-    def apply(self, pre_commit_config: dict[str, Any]) -> None:
-        repo = next(
-            iter(r for r in pre_commit_config["repos"] if r["repo"] == self.repo)
-        )
+    def apply(self, index: PreCommitIndex) -> bool:
+        repo = index.get_repo(self.position, self.repo)
+        if repo is None or repo.get("rev") == self.value:
+            return False
         repo["rev"] = self.value
+        return True
 
+    def patch(self, index: yaml_patch.NodeIndex) -> list[yaml_patch.Edit] | None:
+        repo = index.get_repo(self.position, self.repo)
+        if repo is None:
+            return None
+        return yaml_patch.patch_scalar(yaml_patch.get_value(repo, "rev"), self.value)
 
-@pydantic.dataclasses.dataclass(kw_only=True)
+
+@dataclasses.dataclass
 class UpdateAdditionalDependencies:
     repo: str
+    # Position of the repo in the 'repos' list (see PreCommitIndex)
+    position: int
     hook_id: str
     value: list[str]
 
-    def apply(self, pre_commit_config: dict[str, Any]) -> None:
-        hook = next(
-            iter(
-                h
-                for r in pre_commit_config["repos"]
-                if r["repo"] == self.repo
-                for h in r["hooks"]
-                if h["id"] == self.hook_id
+    def apply(self, index: PreCommitIndex) -> bool:
+        if index.get_repo(self.position, self.repo) is None:
+            return False
+        changed = False
+        for hook in index.hooks.get((self.position, self.hook_id), []):
+            if hook.get("additional_dependencies") != self.value:
+                # Each hook gets its own list, otherwise ruamel.yaml would dump
+                # shared lists as anchors & aliases.
+                hook["additional_dependencies"] = list(self.value)
+                changed = True
+        return changed
+
+    def patch(self, index: yaml_patch.NodeIndex) -> list[yaml_patch.Edit] | None:
+        if index.get_repo(self.position, self.repo) is None:
+            return None
+        edits = []
+        for hook in index.hooks.get((self.position, self.hook_id), []):
+            hook_edits = yaml_patch.patch_sequence(
+                index, yaml_patch.get_value(hook, "additional_dependencies"), self.value
             )
-        )
-        hook["additional_dependencies"] = self.value
+            if hook_edits is None:
+                return None
+            edits.extend(hook_edits)
+        return edits
 
 
-@pydantic.dataclasses.dataclass(kw_only=True)
-class PreCommitHookConfig:
+class PreCommitHookConfig(models.Model):
     id: str
 
+    fields: ClassVar[dict[str, models.Field]] = {"id": models.Field(models.string)}
+    __slots__ = tuple(fields)
+
 
-@pydantic.dataclasses.dataclass(kw_only=True)
-class PreCommitRepoConfig:
+class PreCommitRepoConfig(models.Model):
     repo: str
     hooks: list[PreCommitHookConfig]
-    rev: str = ""
+    rev: str
+
+    fields: ClassVar[dict[str, models.Field]] = {
+        "repo": models.Field(models.string),
+        "hooks": models.Field(models.list_of(models.model(PreCommitHookConfig))),
+        "rev": models.Field(models.string, ""),
+    }
+    __slots__ = (*fields, "position")
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # Position in the 'repos' list, set by from_pre_commit_config. Updates
+        # target it rather than the URL, which may appear several times.
+        self.position = 0
 
     @classmethod
     def from_pre_commit_config(
@@ -106,20 +254,27 @@ class PreCommitRepoConfig:
         """
         Create PreCommitRepoConfig instances from the 'repos' section of a
         pre-commit configuration file."""
-        for repo in config.get("repos", []):
+        for position, repo in enumerate(config.get("repos", [])):
             try:
-                yield cls(**repo)
-            except pydantic.ValidationError as exc:
+                repo_config = cls(**repo)
+            except models.ValidationError as exc:
                 raise exceptions.PreCommitConfigurationError(
                     error=f"Missing required key: {exc}"
                 ) from exc
+            repo_config.position = position
+            yield repo_config
 
 
-@pydantic.dataclasses.dataclass(kw_only=True)
-class UvLockPackageConfig:
+class UvLockPackageConfig(models.Model):
     name: str
     version: str
 
+    fields: ClassVar[dict[str, models.Field]] = {
+        "name": models.Field(models.string),
+        "version": models.Field(models.string),
+    }
+    __slots__ = tuple(fields)
+
     @classmethod
     def from_uv_lock_config(
         cls, config: dict[str, Any]
@@ -134,6 +289,19 @@ class UvLockPackageConfig:
             except KeyError:
                 continue
 
+    @classmethod
+    def from_package_table(
+        cls, table: lock.PackageTable, names: Iterable[str]
+    ) -> Iterable[UvLockPackageConfig]:
+        """
+        Create UvLockPackageConfig instances for the packages of the table whose
+        name is in `names`, ignoring all the others.
+        """
+        for name in names:
+            version = table.get(name)
+            if version is not None:
+                yield cls(name=name, version=version)
+
 
 class RepoConfig(NamedTuple):
     pre_commit: PreCommitRepoConfig
@@ -150,19 +318,11 @@ def map_repos_to_config(
     Map pre-commit repositories to their corresponding PyProject and locked package
     configurations. Returns a dictionary: repo_name to RepoConfig instances.
     """
-    pyproject_configs_by_name = {
-        config.repo_name: config for config in pyproject_config_objs
-    }
     uv_lock_configs_by_name = {config.name: config for config in uv_lock_config_objs}
-    for pre_commit_config in pre_commit_config_objs:
-        repo_name = get_repo_name(pre_commit_config.repo)
-        try:
-            pyproject_config = pyproject_configs_by_name[repo_name]
-        except KeyError:
-            pyproject_config = PyProjectRepoConfig(
-                repo_name=repo_name, fail_if_not_found=False
-            )
-
+    for pre_commit_config, pyproject_config in map_repos_to_pyproject_config(
+        pre_commit_config_objs=pre_commit_config_objs,
+        pyproject_config_objs=pyproject_config_objs,
+    ):
         pypi_name = pyproject_config.final_pypi_package_name
         try:
             locked_package = uv_lock_configs_by_name[pypi_name]
@@ -176,6 +336,28 @@ def map_repos_to_config(
         )
 
 
+def map_repos_to_pyproject_config(
+    pre_commit_config_objs: list[PreCommitRepoConfig],
+    pyproject_config_objs: list[PyProjectRepoConfig],
+) -> Iterable[tuple[PreCommitRepoConfig, PyProjectRepoConfig]]:
+    """
+    Map pre-commit repositories to their corresponding PyProject configuration,
+    using the default configuration for repositories that have none.
+    """
+    pyproject_configs_by_name = {
+        config.repo_name: config for config in pyproject_config_objs
+    }
+    for pre_commit_config in pre_commit_config_objs:
+        repo_name = get_repo_name(pre_commit_config.repo)
+        try:
+            pyproject_config = pyproject_configs_by_name[repo_name]
+        except KeyError:
+            pyproject_config = PyProjectRepoConfig(
+                repo_name=repo_name, fail_if_not_found=False
+            )
+        yield pre_commit_config, pyproject_config
+
+
 def get_repo_name(repo_url: str):
     """
     Extract the repository name from a given URL.
@@ -183,33 +365,138 @@ def get_repo_name(repo_url: str):
     return repo_url.rstrip("/").split("/")[-1].removesuffix(".git")
 
 
-@contextlib.contextmanager
-def yaml_roundtrip(
-    path: pathlib.Path,
-) -> Generator[dict[str, Any], None, None]:
+@dataclasses.dataclass
+class YamlDocument:
+    data: dict[str, Any]
+    changed: bool = False
+    # Updates that changed something, in order
+    updates: list[UpdateProtocol] = dataclasses.field(default_factory=list)
+
+    @functools.cached_property
+    def index(self) -> PreCommitIndex:
+        return PreCommitIndex(self.data)
+
+    def apply(self, update: UpdateProtocol) -> bool:
+        """
+        Apply an update to the document, keeping track of whether it changed.
+        """
+        changed = update.apply(self.index)
+        if changed:
+            self.changed = True
+            self.updates.append(update)
+        return changed
+
+
+def load_pre_commit_config(
+    text: str, profile: profiling.Profile | None = None
+) -> YamlDocument:
     """
-    Context manager for reading and writing YAML files with round-trip preservation.
+    Load a pre-commit configuration with the safe loader, which uses libyaml when
+    available. The document can be updated, but can't be dumped while preserving
+    the formatting (see render_pre_commit_config).
+    """
+    profile = profile or profiling.Profile()
+    yaml = ruamel.yaml.YAML(typ="safe")
+    with profile.span("load pre-commit config"):
+        try:
+            data = yaml.load(text)
+        except ruamel.yaml.YAMLError as exc:
+            raise exceptions.PreCommitConfigurationError(error=str(exc)) from exc
+    if not isinstance(data, dict):
+        raise exceptions.PreCommitConfigurationError(error="Expected a mapping")
+    return YamlDocument(data=cast("dict[str, Any]", data))
+
+
+def render_pre_commit_config(
+    text: str, document: YamlDocument, profile: profiling.Profile | None = None
+) -> str:
     """
+    Return `text`, the pre-commit configuration `document` was loaded from,
+    with the updates applied to the document.
+
+    The round-trip loader is much slower than the safe one, so the updates are
+    applied as edits of the text (see yaml_patch), leaving the rest of it
+    untouched. Only when that's not possible (e.g. a key needs to be added) is
+    the text loaded again with the round-trip loader, to apply the same updates
+    and dump it.
+    """
+    profile = profile or profiling.Profile()
+    with profile.span("patch pre-commit config"):
+        patched = yaml_patch.patch(text, document.updates, expected=document.data)
+        if patched is not None:
+            return patched
     yaml = ruamel.yaml.YAML()
     # https://sourceforge.net/p/ruamel-yaml/tickets/546/
     # ruamel.yaml may introduce trailing spaces when wrapping line, so we disable
     # wrapping.
     yaml.width = 1e6
-    config = cast("dict[str, Any]", yaml.load(path.read_text()))
-    old_config = copy.deepcopy(config)
-    yield config
-    if config != old_config:
-        yaml.indent(mapping=2, sequence=4, offset=2)
-        yaml.dump(config, path)
+    newline = "\r\n" if "\r\n" in text else "\n"
+    with profile.span("load pre-commit config for round-trip"):
+        data = cast("dict[str, Any]", yaml.load(text.replace("\r\n", "\n")))
+    roundtrip_document = YamlDocument(data=data)
+    for update in document.updates:
+        roundtrip_document.apply(update)
+    yaml.indent(mapping=2, sequence=4, offset=2)
+    stream = io.StringIO()
+    with profile.span("dump pre-commit config"):
+        yaml.dump(roundtrip_document.data, stream)
+    return stream.getvalue().replace("\n", newline)
+
+
+@contextlib.contextmanager
+def yaml_check(
+    path: pathlib.Path,
+    profile: profiling.Profile | None = None,
+) -> Generator[YamlDocument, None, None]:
+    """
+    Context manager loading a YAML file without ever writing it. As the formatting
+    doesn't need to be preserved, the file is read with the safe loader.
+    """
+    yield load_pre_commit_config(decode(path, path.read_bytes()), profile=profile)
+
+
+@contextlib.contextmanager
+def yaml_roundtrip(
+    path: pathlib.Path,
+    profile: profiling.Profile | None = None,
+) -> Generator[YamlDocument, None, None]:
+    """
+    Context manager for reading and writing YAML files with round-trip preservation.
+    The file is only written if the document was marked as changed, and most
+    runs don't change anything: the file is loaded with the safe loader, and
+    only rendered again if needed (see render_pre_commit_config).
+    """
+    # Bytes, to keep the line endings as they are
+    text = decode(path, path.read_bytes())
+    document = load_pre_commit_config(text, profile=profile)
+    yield document
+    if document.changed:
+        path.write_bytes(render_pre_commit_config(text, document, profile).encode())
+
+
+def decode(path: pathlib.Path, content: bytes) -> str:
+    """Decode the content of the file at `path`."""
+    try:
+        return content.decode()
+    except UnicodeDecodeError as exc:
+        raise exceptions.InvalidFile(path=path, error=exc) from exc
+
+
+class PreCommitOpener(Protocol):
+    def __call__(
+        self, path: pathlib.Path, profile: profiling.Profile | None = None
+    ) -> contextlib.AbstractContextManager[YamlDocument]: ...
 
 
 class UvExportProtocol(Protocol):
     def __call__(self, params: list[str]) -> list[str]: ...
 
 
-def uv_export(params: list[str]) -> list[str]:
+def uv_export(params: list[str], cwd: pathlib.Path | None = None) -> list[str]:
     """
     Export the list of packages from uv using the provided parameters.
+    uv is run in `cwd` if provided, in the current directory otherwise.
+    Raises UvExportError if uv can't be run or fails.
     """
     base_export_args = [
         "uv",
@@ -220,12 +507,54 @@ def uv_export(params: list[str]) -> list[str]:
         "--no-emit-workspace",
         "--no-annotate",
     ]
-    packages = (
-        subprocess.check_output([*base_export_args, *params], text=True)
-        .strip()
-        .split("\n")
-    )
-    return packages
+    try:
+        output = subprocess.check_output(
+            [*base_export_args, *params], text=True, cwd=cwd
+        )
+    except subprocess.CalledProcessError as exc:
+        raise exceptions.UvExportError(
+            params=" ".join(params), error=f"exit status {exc.returncode}"
+        ) from exc
+    except OSError as exc:
+        raise exceptions.UvExportError(params=" ".join(params), error=exc) from exc
+    return [line for line in output.splitlines() if line]
+
+
+def get_project_uv_export(directory: pathlib.Path) -> UvExportProtocol:
+    """
+    Return a UvExportProtocol running uv in the given project directory.
+    """
+    return functools.partial(uv_export, cwd=directory)
+
+
+def profiled_uv_export(
+    uv_export: UvExportProtocol, profile: profiling.Profile
+) -> UvExportProtocol:
+    """
+    Wrap a UvExportProtocol so that each call is recorded in the profile.
+    """
+
+    def export(params: list[str]) -> list[str]:
+        with profile.span(profiling.UV_EXPORT, params=" ".join(params)):
+            return uv_export(params)
+
+    return export
+
+
+def counted_uv_export(
+    uv_export: UvExportProtocol, summary: SyncSummary
+) -> UvExportProtocol:
+    """
+    Wrap a UvExportProtocol so that each call is counted in the summary. Wrap the
+    function actually running uv, so that exports served from the cache or
+    computed from uv.lock aren't counted.
+    """
+
+    def export(params: list[str]) -> list[str]:
+        summary.uv_export_calls += 1
+        return uv_export(params)
+
+    return export
 
 
 def sync_revision(
@@ -244,16 +573,193 @@ def sync_revision(
         prefix = "v" if repo_config.pre_commit.rev.startswith("v") else ""
         new_rev = f"{prefix}{repo_config.locked_package.version}"
         if repo_config.pre_commit.rev != new_rev:
-            yield UpdateRev(repo=repo_config.pre_commit.repo, value=new_rev)
+            yield UpdateRev(
+                repo=repo_config.pre_commit.repo,
+                position=repo_config.pre_commit.position,
+                value=new_rev,
+            )
 
 
-def sync_additional_dependencies(
-    *,
-    repo_config: RepoConfig,
+@dataclasses.dataclass
+class SyncSummary:
+    updates: int = 0
+    uv_export_calls: int = 0
+    uv_export_calls_saved: int = 0
+    uv_export_cache_hits: int = 0
+    uv_export_calls_native: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.updates} update(s) applied, "
+            f"{self.uv_export_calls} uv export call(s), "
+            f"{self.uv_export_calls_saved} saved by deduplication, "
+            f"{self.uv_export_calls_native} computed from uv.lock, "
+            f"{self.uv_export_cache_hits} served from cache"
+        )
+
+
+def normalize_uv_params(params: list[str]) -> tuple[str, ...]:
+    """
+    Normalize uv export parameters so that equivalent invocations compare equal,
+    e.g. ["--group=typing"] and ["--group", "typing"].
+    """
+    normalized: list[str] = []
+    for param in params:
+        if param.startswith("--") and "=" in param:
+            normalized.extend(param.split("=", 1))
+        else:
+            normalized.append(param)
+    return tuple(normalized)
+
+
+def cached_uv_export(
     uv_export: UvExportProtocol,
-) -> Iterable[UpdateProtocol]:
+    export_cache: cache.ExportCacheProtocol,
+    inputs: Iterable[bytes],
+    summary: SyncSummary | None = None,
+    uv_lock: bytes = b"",
+    lock_resolver: resolver.LockResolver | None = None,
+) -> UvExportProtocol:
     """
-    Synchronize the additional dependencies of a pre-commit hook with the locked package version.
+    Wrap a UvExportProtocol so that its results are stored in the cache.
+    `inputs` are the contents of the files the export depends on (pyproject.toml
+    and uv.lock); they are part of the cache key along with the parameters and
+    the uv executable.
+
+    Alternatively, uv.lock may be passed as `uv_lock` along with a
+    `lock_resolver`: only the parts of uv.lock the export may depend on are then
+    part of the key (see LockResolver.get_footprint), so that the result of
+    an export stays valid when unrelated packages are upgraded.
+    """
+    summary = summary or SyncSummary()
+    key_prefix = [*inputs, cache.get_uv_identity().encode()]
+
+    def export(params: list[str]) -> list[str]:
+        normalized = normalize_uv_params(params)
+        footprint = lock_resolver.get_footprint(normalized) if lock_resolver else None
+        key = cache.hash_parts(
+            [
+                *key_prefix,
+                uv_lock if footprint is None else footprint.encode(),
+                *(param.encode() for param in normalized),
+            ]
+        )
+        result = export_cache.get(key)
+        if result is not None:
+            summary.uv_export_cache_hits += 1
+            return result
+        result = uv_export(params)
+        export_cache.set(key, result)
+        return result
+
+    return export
+
+
+@contextlib.contextmanager
+def concurrent_uv_export(
+    uv_export: UvExportProtocol,
+    params_list: Iterable[list[str]],
+    max_workers: int | None = None,
+    summary: SyncSummary | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> Generator[UvExportProtocol, None, None]:
+    """
+    Context manager that starts all the given exports in a thread pool right away,
+    and yields a UvExportProtocol that hands out their results. Equivalent
+    parameters (see normalize_uv_params) only lead to a single export. Exports
+    that weren't started upfront are started when requested.
+
+    The exports run in `executor` if provided (e.g. shared between projects, see
+    sync_many), otherwise in a pool of `max_workers` threads.
+    """
+    summary = summary or SyncSummary()
+    futures: dict[tuple[str, ...], concurrent.futures.Future[list[str]]] = {}
+    with (
+        contextlib.nullcontext(executor)
+        if executor
+        else concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    ) as pool:
+
+        def submit(params: list[str]) -> concurrent.futures.Future[list[str]]:
+            key = normalize_uv_params(params)
+            if key in futures:
+                summary.uv_export_calls_saved += 1
+            else:
+                futures[key] = pool.submit(uv_export, params)
+            return futures[key]
+
+        def export(params: list[str]) -> list[str]:
+            future = futures.get(normalize_uv_params(params)) or submit(params)
+            return future.result()
+
+        try:
+            for params in params_list:
+                submit(params)
+            yield export
+        finally:
+            # Don't wait for exports we won't use (e.g. if an error occurred).
+            for future in futures.values():
+                future.cancel()
+
+
+def native_uv_export(
+    uv_export: UvExportProtocol,
+    lock_resolver: resolver.LockResolver,
+    summary: SyncSummary | None = None,
+) -> UvExportProtocol:
+    """
+    Wrap a UvExportProtocol so that exports the lock resolver can compute from
+    uv.lock don't spawn uv. Anything else is passed to `uv_export`.
+    """
+    summary = summary or SyncSummary()
+
+    def export(params: list[str]) -> list[str]:
+        lines = lock_resolver.export(normalize_uv_params(params))
+        if lines is None:
+            return uv_export(params)
+        summary.uv_export_calls_native += 1
+        return lines
+
+    return export
+
+
+def environment_uv_export(
+    uv_export: UvExportProtocol, environment: dict[str, str]
+) -> UvExportProtocol:
+    """
+    Wrap a UvExportProtocol so that requirements whose marker doesn't match the
+    target `environment` are removed, and the markers of the other ones are
+    dropped. Markers that can't be evaluated are kept as is.
+    """
+    frozen_environment = resolver.freeze_environment(environment)
+
+    def export(params: list[str]) -> list[str]:
+        lines = []
+        for line in uv_export(params):
+            requirement, _, marker = line.partition(" ; ")
+            matches = (
+                resolver.evaluate_marker(marker, frozen_environment) if marker else True
+            )
+            if matches is None:
+                lines.append(line)
+            elif matches:
+                lines.append(requirement)
+        return lines
+
+    return export
+
+
+class ExportRequest(NamedTuple):
+    repo: str
+    position: int
+    hook_id: str
+    params: list[str]
+
+
+def get_export_requests(repo_config: RepoConfig) -> Iterable[ExportRequest]:
+    """
+    List the uv export calls needed to synchronize the additional dependencies
+    of the hooks of a pre-commit repository.
     """
     uv_params = repo_config.pyproject.additional_dependencies_uv_params
     for hook in repo_config.pre_commit.hooks:
@@ -265,19 +771,124 @@ def sync_additional_dependencies(
         if params_for_hook is None:
             continue
 
-        dependencies = uv_export(params_for_hook)
-        yield UpdateAdditionalDependencies(
+        yield ExportRequest(
             repo=repo_config.pre_commit.repo,
+            position=repo_config.pre_commit.position,
             hook_id=hook.id,
+            params=params_for_hook,
+        )
+
+
+def sync_additional_dependencies(
+    *,
+    repo_config: RepoConfig,
+    uv_export: UvExportProtocol,
+    profile: profiling.Profile | None = None,
+) -> Iterable[UpdateProtocol]:
+    """
+    Synchronize the additional dependencies of a pre-commit hook with the locked package version.
+    """
+    profile = profile or profiling.Profile()
+    for request in get_export_requests(repo_config):
+        with profile.span(
+            profiling.HOOK_EXPORT, repo=request.repo, hook_id=request.hook_id
+        ):
+            dependencies = uv_export(request.params)
+        yield UpdateAdditionalDependencies(
+            repo=request.repo,
+            position=request.position,
+            hook_id=request.hook_id,
             value=dependencies,
         )
 
 
-def sync_config(
-    mapping: Iterable[RepoConfig], uv_export: UvExportProtocol
+# The `repo:` and `id:` keys of a pre-commit configuration in block style, the one
+# documented by pre-commit.
+PRE_COMMIT_KEY_RE = re.compile(
+    r"""^[ \t-]*(repo|id):[ \t]*["']?([^"'#\s]+)""", flags=re.MULTILINE
+)
+
+
+def scan_pre_commit_config(text: str) -> tuple[set[str], set[str]]:
+    """
+    Return the names of the repos (see get_repo_name) and the ids of the hooks
+    found in the text of a pre-commit configuration, without loading it, which
+    takes a while. Repos and hooks written in flow style are missed.
+    """
+    repo_names: set[str] = set()
+    hook_ids: set[str] = set()
+    for key, value in PRE_COMMIT_KEY_RE.findall(text):
+        if key == "repo":
+            repo_names.add(get_repo_name(value))
+        else:
+            hook_ids.add(value)
+    return repo_names, hook_ids
+
+
+def get_uv_params(
+    pyproject_config_objs: Iterable[PyProjectRepoConfig],
+    pre_commit_text: str,
+) -> Iterable[list[str]]:
+    """
+    List the uv export parameters found in the pyproject.toml configuration,
+    for the repos and hooks that appear in the text of the pre-commit
+    configuration (see scan_pre_commit_config), so that they can be started
+    before it's loaded.
+    """
+    repo_names, hook_ids = scan_pre_commit_config(pre_commit_text)
+    for config in pyproject_config_objs:
+        if config.repo_name not in repo_names:
+            continue
+        uv_params = config.additional_dependencies_uv_params
+        if isinstance(uv_params, dict):
+            yield from (
+                params for hook_id, params in uv_params.items() if hook_id in hook_ids
+            )
+        elif uv_params is not None:
+            yield uv_params
+
+
+@contextlib.contextmanager
+def prefetch_uv_exports(
+    uv_export: UvExportProtocol,
+    params_list: Iterable[list[str]],
+    jobs: int | None = None,
+    summary: SyncSummary | None = None,
+    lock_resolver: resolver.LockResolver | None = None,
+    environment: dict[str, str] | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> Generator[UvExportProtocol, None, None]:
+    """
+    Context manager starting the given exports right away, running up to `jobs`
+    of them in parallel (or in `executor`), and yielding a UvExportProtocol that
+    hands out their results (see concurrent_uv_export).
+    If `lock_resolver` is provided, the exports it understands are computed
+    in-process instead (see native_uv_export). That decision is made in the
+    pool too, so that parsing uv.lock doesn't delay the exports that need uv.
+    If `environment` is provided, exported requirements are trimmed to the ones
+    needed in that environment (see environment_uv_export).
+    """
+    if environment is not None:
+        uv_export = environment_uv_export(uv_export, environment=environment)
+    if lock_resolver:
+        uv_export = native_uv_export(uv_export, lock_resolver, summary=summary)
+    with concurrent_uv_export(
+        uv_export=uv_export,
+        params_list=params_list,
+        max_workers=jobs,
+        summary=summary,
+        executor=executor,
+    ) as prefetched_uv_export:
+        yield prefetched_uv_export
+
+
+def get_updates(
+    mapping: Iterable[RepoConfig],
+    uv_export: UvExportProtocol,
+    profile: profiling.Profile | None = None,
 ) -> Iterable[UpdateProtocol]:
     """
-    Update the pre-commit configuration dictionary based on the provided mapping.
+    Yield the updates needed for each repository of the mapping, in order.
     """
     for repo_config in mapping:
         if repo_config.pyproject.sync_revision:
@@ -289,39 +900,350 @@ def sync_config(
             yield from sync_additional_dependencies(
                 repo_config=repo_config,
                 uv_export=uv_export,
+                profile=profile,
             )
 
 
+class FileContents:
+    """
+    Memoized contents of the files read during a run, and of their parsed forms.
+    When syncing several projects, files shared between them (e.g. the uv.lock
+    of a uv workspace) are only read and parsed once.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.cache: dict[tuple[Hashable, Callable[[str], Any] | None], Any] = {}
+
+    def get_key(self, path: pathlib.Path) -> Hashable:
+        return path.resolve()
+
+    def load(self, path: pathlib.Path) -> bytes:
+        return path.read_bytes()
+
+    def read_bytes(self, path: pathlib.Path) -> bytes:
+        key = (self.get_key(path), None)
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = self.load(path)
+            return self.cache[key]
+
+    def forget(self, paths: Iterable[pathlib.Path]) -> None:
+        """Drop what was read from these files, e.g. because they changed."""
+        keys = {self.get_key(path) for path in paths}
+        with self.lock:
+            for key in [key for key in self.cache if key[0] in keys]:
+                del self.cache[key]
+
+    def parse(self, path: pathlib.Path, parser: Callable[[str], T]) -> T:
+        """
+        Return the result of `parser` on the content of the file at `path`.
+        Raises InvalidFile if the parser raises a ValueError, like TOML errors.
+        """
+        key = (self.get_key(path), parser)
+        # Reading outside of the lock: read_bytes takes it too.
+        text = decode(path, self.read_bytes(path))
+        with self.lock:
+            if key not in self.cache:
+                try:
+                    self.cache[key] = parser(text)
+                except ValueError as exc:
+                    raise exceptions.InvalidFile(path=path, error=exc) from exc
+            return self.cache[key]
+
+
+class MemoryContents(FileContents):
+    """
+    FileContents reading from `contents`, a mapping of paths to the bytes of the
+    files, without ever touching the filesystem (see plan).
+    """
+
+    def __init__(self, contents: dict[pathlib.Path, bytes]) -> None:
+        super().__init__()
+        self.contents = contents
+
+    def get_key(self, path: pathlib.Path) -> Hashable:
+        return path
+
+    def load(self, path: pathlib.Path) -> bytes:
+        try:
+            return self.contents[path]
+        except KeyError:
+            raise exceptions.PathDoesNotExist(path=path) from None
+
+
 def sync(
     *,
     pyproject_path: pathlib.Path,
     pre_commit_path: pathlib.Path,
     uv_lock_path: pathlib.Path,
     uv_export: UvExportProtocol = uv_export,
-):
+    jobs: int | None = None,
+    export_cache: cache.ExportCacheProtocol | None = None,
+    files: FileContents | None = None,
+    profile: profiling.Profile | None = None,
+    check: bool = False,
+    lock_index: cache.LockIndexProtocol | None = None,
+    open_pre_commit: PreCommitOpener | None = None,
+    executor: concurrent.futures.Executor | None = None,
+) -> SyncSummary:
     """
     Main entry point.
     Reads the pyproject.toml, pre-commit configuration file, and uv.lock file,
     maps the repositories to their configurations, and updates the pre-commit
     configuration file.
 
+    `jobs` is the maximum number of uv exports running in parallel. If not
+    provided, it's read from the pyproject.toml settings. If `executor` is
+    provided, exports run in it instead, and `jobs` is ignored.
+
+    If `export_cache` is provided, uv export results are read from and stored in it.
+
+    pyproject.toml and uv.lock are read through `files`, which may be shared
+    with other calls (see sync_many).
+
+    If provided, `profile` records the time spent in each phase.
+
+    If `check` is True, the pre-commit configuration file is left untouched, and
+    the summary counts the updates that would have been applied.
+
+    If `lock_index` is provided, the parsed uv.lock and its table of package
+    versions are read from and stored in it.
+
+    The pre-commit configuration is opened with `open_pre_commit` if provided,
+    instead of yaml_check or yaml_roundtrip depending on `check`.
+
+    Returns a summary of what was done.
+
     This function mainly does the parsing and delegates the actual syncing
-    to the sync_configs function.
+    to the get_updates function.
     """
-    with yaml_roundtrip(pre_commit_path) as pre_commit_dict:
-        pyproject_config = PyProjectRepoConfig.from_pyproject_config(
-            toml.read_toml(pyproject_path)
+    summary = SyncSummary()
+    files = files or FileContents()
+    profile = profile or profiling.Profile()
+    uv_export = counted_uv_export(profiled_uv_export(uv_export, profile), summary)
+    with profile.span("parse pyproject.toml"):
+        pyproject_dict = files.parse(pyproject_path, toml.parse_toml)
+    with profile.span("validate configuration"):
+        settings = ToolSettings.from_pyproject_config(pyproject_dict)
+        pyproject_config = list(
+            PyProjectRepoConfig.from_pyproject_config(pyproject_dict)
         )
-        pre_commit_config = PreCommitRepoConfig.from_pre_commit_config(pre_commit_dict)
-
-        uv_lock_config = UvLockPackageConfig.from_uv_lock_config(
-            toml.read_toml(uv_lock_path)
+    lock_resolver = resolver.LockResolver(
+        pyproject_config=pyproject_dict,
+        load_lock=profile.span("parse uv.lock")(
+            functools.partial(
+                files.parse,
+                uv_lock_path,
+                lock_index.parse if lock_index else lock.parse_lock,
+            )
+        ),
+        environment=settings.environment,
+    )
+    if export_cache:
+        uv_export = cached_uv_export(
+            uv_export=uv_export,
+            export_cache=export_cache,
+            inputs=[files.read_bytes(pyproject_path)],
+            summary=summary,
+            uv_lock=files.read_bytes(uv_lock_path),
+            lock_resolver=lock_resolver,
         )
+    open_pre_commit = open_pre_commit or (yaml_check if check else yaml_roundtrip)
+    # The exports only depend on pyproject.toml and uv.lock: start the ones the
+    # pre-commit configuration seems to need before loading it, which takes a
+    # while. Any export missed here is started when requested.
+    with (
+        prefetch_uv_exports(
+            uv_export=uv_export,
+            params_list=get_uv_params(
+                pyproject_config,
+                pre_commit_text=decode(pre_commit_path, files.load(pre_commit_path)),
+            ),
+            jobs=jobs or settings.jobs,
+            summary=summary,
+            lock_resolver=lock_resolver,
+            environment=settings.environment,
+            executor=executor,
+        ) as prefetched_uv_export,
+        open_pre_commit(pre_commit_path, profile=profile) as pre_commit_document,
+    ):
+        with profile.span("validate configuration"):
+            pre_commit_config = list(
+                PreCommitRepoConfig.from_pre_commit_config(pre_commit_document.data)
+            )
+
+        # Only the packages matching a pre-commit repo are worth extracting
+        needed_package_names = {
+            repo_pyproject_config.final_pypi_package_name
+            for _, repo_pyproject_config in map_repos_to_pyproject_config(
+                pre_commit_config_objs=pre_commit_config,
+                pyproject_config_objs=pyproject_config,
+            )
+        }
+        with profile.span("read locked versions"):
+            uv_lock_config = UvLockPackageConfig.from_package_table(
+                files.parse(
+                    uv_lock_path,
+                    lock_index.get_package_table
+                    if lock_index
+                    else lock.PackageTable.from_text,
+                ),
+                names=needed_package_names,
+            )
 
         mapping = map_repos_to_config(
-            pre_commit_config_objs=list(pre_commit_config),
-            pyproject_config_objs=list(pyproject_config),
+            pre_commit_config_objs=pre_commit_config,
+            pyproject_config_objs=pyproject_config,
             uv_lock_config_objs=list(uv_lock_config),
         )
-        for update in sync_config(mapping=mapping, uv_export=uv_export):
-            update.apply(pre_commit_dict)
+        for update in get_updates(
+            mapping, uv_export=prefetched_uv_export, profile=profile
+        ):
+            if pre_commit_document.apply(update):
+                summary.updates += 1
+    if export_cache:
+        export_cache.evict()
+    if lock_index:
+        lock_index.evict()
+    return summary
+
+
+class ProjectResult(NamedTuple):
+    project: discovery.Project
+    summary: SyncSummary | None = None
+    error: exceptions.SyncPreCommitWithUvException | None = None
+
+
+def sync_many(
+    *,
+    projects: list[discovery.Project],
+    uv_export: UvExportProtocol | None = None,
+    jobs: int | None = None,
+    export_cache: cache.ExportCacheProtocol | None = None,
+    profile: profiling.Profile | None = None,
+    check: bool = False,
+    files: FileContents | None = None,
+    lock_index: cache.LockIndexProtocol | None = None,
+) -> list[ProjectResult]:
+    """
+    Sync several projects in the same process, up to `jobs` of them in parallel.
+    Errors are reported per project rather than interrupting the other ones.
+
+    The uv exports of all the projects share a single pool, so that no more than
+    `jobs` of them run at the same time, overall. The 'jobs' setting of each
+    project only applies when there's a single one.
+
+    Unless a custom `uv_export` is provided, uv runs in the directory of each
+    project's pyproject.toml.
+
+    `files` may be provided to reuse what was read by a previous call (see
+    FileContents.forget for invalidating it).
+    """
+    pre_commit_paths = [p.pre_commit_config.resolve() for p in projects]
+    for path in pre_commit_paths:
+        if pre_commit_paths.count(path) > 1:
+            raise exceptions.SharedPreCommitConfig(path=path)
+
+    files = files or FileContents()
+    profile = profile or profiling.Profile()
+
+    @profile.span("sync project")
+    def sync_project(project: discovery.Project) -> ProjectResult:
+        try:
+            summary = sync(
+                pyproject_path=project.pyproject_config,
+                pre_commit_path=project.pre_commit_config,
+                uv_lock_path=project.uv_lock,
+                uv_export=uv_export
+                or get_project_uv_export(project.pyproject_config.parent),
+                jobs=jobs,
+                export_cache=export_cache,
+                files=files,
+                profile=profile,
+                check=check,
+                lock_index=lock_index,
+                executor=export_executor if len(projects) > 1 else None,
+            )
+        except exceptions.SyncPreCommitWithUvException as exc:
+            return ProjectResult(project=project, error=exc)
+        return ProjectResult(project=project, summary=summary)
+
+    with (
+        concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as export_executor,
+        concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor,
+    ):
+        return list(executor.map(sync_project, projects))
+
+
+def unavailable_uv_export(params: list[str]) -> list[str]:
+    raise exceptions.ExportNotAvailable(params=" ".join(params))
+
+
+class Plan(NamedTuple):
+    updates: list[UpdateProtocol]
+    pre_commit_config: str
+    summary: SyncSummary
+
+
+def plan(
+    *,
+    pyproject: str | bytes,
+    pre_commit_config: str | bytes,
+    uv_lock: str | bytes,
+    uv_export: UvExportProtocol = unavailable_uv_export,
+    jobs: int | None = None,
+    export_cache: cache.ExportCacheProtocol | None = None,
+    lock_index: cache.LockIndexProtocol | None = None,
+    profile: profiling.Profile | None = None,
+) -> Plan:
+    """
+    Like sync, but on the contents of the files rather than on their paths, for
+    tools embedding this one (bots, editor integrations...). Nothing is read
+    from or written to the filesystem: the updates are returned, along with the
+    resulting pre-commit configuration (`pre_commit_config` itself if nothing
+    changed).
+
+    uv is not run either: the exports that can't be computed from uv.lock raise
+    ExportNotAvailable, unless a `uv_export` is provided.
+
+    Pass the same `lock_index` (e.g. a cache.MemoryLockIndex) to successive
+    calls so that a uv.lock shared by several of them is only parsed once.
+    """
+    pyproject_path = pathlib.Path("pyproject.toml")
+    pre_commit_path = pathlib.Path(".pre-commit-config.yaml")
+    uv_lock_path = pathlib.Path("uv.lock")
+    if isinstance(pre_commit_config, bytes):
+        pre_commit_config = pre_commit_config.decode()
+    files = MemoryContents(
+        {
+            pyproject_path: pyproject.encode()
+            if isinstance(pyproject, str)
+            else pyproject,
+            uv_lock_path: uv_lock.encode() if isinstance(uv_lock, str) else uv_lock,
+            pre_commit_path: pre_commit_config.encode(),
+        }
+    )
+    profile = profile or profiling.Profile()
+    document = load_pre_commit_config(pre_commit_config, profile=profile)
+    summary = sync(
+        pyproject_path=pyproject_path,
+        pre_commit_path=pre_commit_path,
+        uv_lock_path=uv_lock_path,
+        uv_export=uv_export,
+        jobs=jobs,
+        export_cache=export_cache,
+        files=files,
+        profile=profile,
+        lock_index=lock_index,
+        open_pre_commit=lambda path, profile=None: contextlib.nullcontext(document),
+    )
+    if document.changed:
+        pre_commit_config = render_pre_commit_config(
+            pre_commit_config, document, profile=profile
+        )
+    return Plan(
+        updates=document.updates,
+        pre_commit_config=pre_commit_config,
+        summary=summary,
+    )
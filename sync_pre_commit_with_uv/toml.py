@@ -13,4 +13,9 @@ import pathlib
 
 def read_toml(file_path: pathlib.Path) -> dict[str, Any]:
     """Read a TOML file and return its content as a dictionary."""
-    return toml.loads(file_path.read_text())
+    return parse_toml(file_path.read_text())
+
+
+def parse_toml(text: str) -> dict[str, Any]:
+    """Parse a TOML string and return its content as a dictionary."""
+    return toml.loads(text)
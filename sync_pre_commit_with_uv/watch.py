@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import pathlib
+from collections.abc import Iterable
+
+# Used by --watch. There's no portable way of being notified of file changes in
+# the standard library, so we poll: the handful of files we watch are cheap to
+# stat.
+
+Signature = tuple[int, int, int]
+
+
+def get_signature(path: pathlib.Path) -> Signature | None:
+    """
+    Return a value that changes when the file is modified or replaced, None if
+    it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class Watcher:
+    """Tracks changes to a set of files, by polling their signature."""
+
+    def __init__(self, paths: Iterable[pathlib.Path] = ()) -> None:
+        self.signatures: dict[pathlib.Path, Signature | None] = {}
+        self.add(paths)
+
+    def add(self, paths: Iterable[pathlib.Path]) -> None:
+        """
+        Start watching the given files. Files already watched are left as they
+        are, so that their pending changes are still reported by poll().
+        """
+        for path in paths:
+            path = path.resolve()
+            if path not in self.signatures:
+                self.signatures[path] = get_signature(path)
+
+    def poll(self) -> set[pathlib.Path]:
+        """Return the (resolved) files that changed since the last call."""
+        changed = set()
+        for path, signature in self.signatures.items():
+            new_signature = get_signature(path)
+            if new_signature != signature:
+                self.signatures[path] = new_signature
+                changed.add(path)
+        return changed
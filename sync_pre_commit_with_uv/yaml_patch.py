@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable
+from typing import Any, NamedTuple, Protocol
+
+import ruamel.yaml
+from ruamel.yaml import nodes, resolver
+
+# Applies updates to the text of a YAML document instead of dumping it again, so
+# that everything else is left byte for byte as it was. Only changes to the values
+# of existing scalars and sequences of scalars are supported: whenever something
+# else is needed, we return None and the caller should do a full round-trip dump.
+
+STR_TAG = "tag:yaml.org,2002:str"
+RESOLVER = resolver.VersionedResolver()
+PLAIN_RE = re.compile(r"[A-Za-z0-9_.][^\r\n]*")
+
+
+class Edit(NamedTuple):
+    """Replace the characters between `start` and `end` with `text`."""
+
+    start: int
+    end: int
+    text: str
+
+
+class PatchProtocol(Protocol):
+    def patch(self, index: NodeIndex) -> list[Edit] | None:
+        """Return the edits needed to apply the update, None if impossible."""
+        ...
+
+
+def get_value(node: nodes.Node | None, key: str) -> nodes.Node | None:
+    """Return the value node of `key` in a mapping node, if any."""
+    if not isinstance(node, nodes.MappingNode):
+        return None
+    for key_node, value_node in node.value:
+        if isinstance(key_node, nodes.ScalarNode) and key_node.value == key:
+            return value_node
+    return None
+
+
+def get_items(node: nodes.Node | None) -> list[nodes.Node]:
+    return node.value if isinstance(node, nodes.SequenceNode) else []
+
+
+class NodeIndex:
+    """
+    Like sync.PreCommitIndex, but over the nodes of the composed document, which
+    know their position in `text`.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.newline = "\r\n" if "\r\n" in text else "\n"
+        root = ruamel.yaml.YAML(typ="safe").compose(text)
+        self.repos: list[nodes.Node] = get_items(get_value(root, "repos"))
+        self.hooks: dict[tuple[int, str], list[nodes.MappingNode]] = {}
+        for position, repo in enumerate(self.repos):
+            for hook in get_items(get_value(repo, "hooks")):
+                if not isinstance(hook, nodes.MappingNode):
+                    continue
+                hook_id = get_value(hook, "id")
+                if isinstance(hook_id, nodes.ScalarNode):
+                    self.hooks.setdefault((position, hook_id.value), []).append(hook)
+
+    def get_repo(self, position: int, url: str) -> nodes.Node | None:
+        """Return the repo at `position`, if it's still the one for `url`."""
+        if position >= len(self.repos):
+            return None
+        repo = self.repos[position]
+        repo_url = get_value(repo, "repo")
+        if not isinstance(repo_url, nodes.ScalarNode) or repo_url.value != url:
+            return None
+        return repo
+
+    def line_end(self, index: int) -> int:
+        """Return the position of the end of the line containing `index`."""
+        end = self.text.find("\n", index)
+        if end == -1:
+            return len(self.text)
+        return end - 1 if self.text[end - 1] == "\r" else end
+
+    def line_prefix(self, node: nodes.Node) -> str:
+        """Return the text between the start of the line and the node."""
+        start = node.start_mark.index
+        return self.text[self.text.rfind("\n", 0, start) + 1 : start]
+
+
+# Scalar styles we know how to render. The C parser uses "" for the plain style,
+# the Python one uses None.
+SIMPLE_STYLES = (None, "", '"', "'")
+
+
+def is_simple_scalar(node: nodes.Node) -> bool:
+    return isinstance(node, nodes.ScalarNode) and node.style in SIMPLE_STYLES
+
+
+def render_scalar(value: str, style: str | None) -> str:
+    """Render a string in the given style, or double-quoted if it can't be."""
+    if style == "'":
+        return "'" + value.replace("'", "''") + "'"
+    if (
+        style in (None, "")
+        and PLAIN_RE.fullmatch(value)
+        and ": " not in value
+        and " #" not in value
+        and not value.endswith(":")
+        and RESOLVER.resolve(nodes.ScalarNode, value, (True, False)) == STR_TAG
+    ):
+        return value
+    return json.dumps(value)
+
+
+def patch_scalar(node: nodes.Node | None, value: str) -> list[Edit] | None:
+    if not isinstance(node, nodes.ScalarNode) or node.style not in SIMPLE_STYLES:
+        return None
+    if node.value == value:
+        return []
+    return [
+        Edit(
+            start=node.start_mark.index,
+            end=node.end_mark.index,
+            text=render_scalar(value, node.style),
+        )
+    ]
+
+
+def patch_sequence(
+    index: NodeIndex, node: nodes.Node | None, values: list[str]
+) -> list[Edit] | None:
+    if not isinstance(node, nodes.SequenceNode):
+        return None
+    items = node.value
+    if not items or not values or not all(map(is_simple_scalar, items)):
+        return None
+    style = items[-1].style
+    if node.flow_style:
+        text = ", ".join(render_scalar(value, style) for value in values)
+        return [Edit(node.start_mark.index, node.end_mark.index, f"[{text}]")]
+
+    prefix = index.line_prefix(items[0])
+    if prefix.strip() != "-":
+        return None
+    edits = []
+    for item, value in zip(items, values):
+        edits.extend(patch_scalar(item, value) or [])
+    if len(values) > len(items):
+        # Added after the comment of the last item, if any
+        position = index.line_end(items[-1].end_mark.index)
+        text = "".join(
+            index.newline + prefix + render_scalar(value, style)
+            for value in values[len(items) :]
+        )
+        edits.append(Edit(position, position, text))
+    elif len(values) < len(items):
+        # Remove whole lines, from the end of the last item we keep
+        edits.append(
+            Edit(
+                index.line_end(items[len(values) - 1].end_mark.index),
+                index.line_end(items[-1].end_mark.index),
+                "",
+            )
+        )
+    return edits
+
+
+def apply_edits(text: str, edits: Iterable[Edit]) -> str | None:
+    """Apply non-overlapping edits to the text, None if some overlap."""
+    parts = []
+    position = 0
+    for edit in sorted(edits):
+        if edit.start < position:
+            return None
+        parts += [text[position : edit.start], edit.text]
+        position = edit.end
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def patch(text: str, updates: Iterable[PatchProtocol], expected: Any) -> str | None:
+    """
+    Return `text` with the updates applied, or None if they can't all be applied
+    as edits, or if the result wouldn't load as `expected`.
+    """
+    index = NodeIndex(text)
+    edits = []
+    for update in updates:
+        update_edits = update.patch(index)
+        if update_edits is None:
+            return None
+        edits.extend(update_edits)
+    patched = apply_edits(text, edits)
+    if patched is None or ruamel.yaml.YAML(typ="safe").load(patched) != expected:
+        return None
+    return patched
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path: pathlib.Path, monkeypatch) -> pathlib.Path:
+    """Never read or write the user's actual cache directory during tests."""
+    path = tmp_path / "xdg-cache"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
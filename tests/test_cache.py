@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import time
+
+from sync_pre_commit_with_uv import cache, lock
+
+
+def test_default_cache_dir(monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", "/foo")
+    assert cache.default_cache_dir() == pathlib.Path("/foo/sync-pre-commit-with-uv")
+
+
+def test_default_cache_dir__no_xdg(monkeypatch):
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    assert (
+        cache.default_cache_dir()
+        == pathlib.Path.home() / ".cache" / "sync-pre-commit-with-uv"
+    )
+
+
+def test_get_uv_identity(mocker, tmp_path: pathlib.Path):
+    uv = tmp_path / "uv"
+    uv.write_text("foo")
+    mocker.patch("shutil.which", return_value=str(uv))
+    assert cache.get_uv_identity().startswith(f"{uv}:3:")
+
+
+def test_get_uv_identity__not_found(mocker):
+    mocker.patch("shutil.which", return_value=None)
+    assert cache.get_uv_identity() == ""
+
+
+def test_hash_parts():
+    assert cache.hash_parts([b"ab", b"c"]) != cache.hash_parts([b"a", b"bc"])
+
+
+def test_export_cache(tmp_path: pathlib.Path):
+    export_cache = cache.ExportCache(tmp_path)
+    assert export_cache.get("foo") is None
+
+    export_cache.set("foo", ["package==1.0.0"])
+    assert export_cache.get("foo") == ["package==1.0.0"]
+
+
+def test_export_cache__invalid_entry(tmp_path: pathlib.Path):
+    export_cache = cache.ExportCache(tmp_path)
+    export_cache.directory.mkdir()
+    export_cache.path("foo").write_text("{}")
+    export_cache.path("bar").write_text("not json")
+
+    assert export_cache.get("foo") is None
+    assert export_cache.get("bar") is None
+
+
+def test_export_cache__evict_age(tmp_path: pathlib.Path):
+    export_cache = cache.ExportCache(tmp_path, max_age=60)
+    export_cache.set("old", [])
+    export_cache.set("new", [])
+    two_minutes_ago = time.time() - 120
+    os.utime(export_cache.path("old"), (two_minutes_ago, two_minutes_ago))
+
+    export_cache.evict()
+
+    assert export_cache.get("old") is None
+    assert export_cache.get("new") == []
+
+
+def test_export_cache__evict_size(tmp_path: pathlib.Path):
+    export_cache = cache.ExportCache(tmp_path, max_size=20)
+    export_cache.set("old", ["a" * 10])
+    export_cache.set("new", ["b" * 10])
+    one_minute_ago = time.time() - 60
+    os.utime(export_cache.path("old"), (one_minute_ago, one_minute_ago))
+
+    export_cache.evict()
+
+    assert export_cache.get("old") is None
+    assert export_cache.get("new") == ["b" * 10]
+
+
+def test_export_cache__evict_missing_directory(tmp_path: pathlib.Path):
+    cache.ExportCache(tmp_path / "missing").evict()
+
+
+def test_memory_export_cache(tmp_path: pathlib.Path):
+    backend = cache.ExportCache(tmp_path)
+    backend.set("a", ["foo==1.0.0"])
+    export_cache = cache.MemoryExportCache(backend=backend)
+
+    assert export_cache.get("a") == ["foo==1.0.0"]
+    assert export_cache.get("b") is None
+
+    export_cache.set("b", ["bar==1.0.0"])
+    assert backend.get("b") == ["bar==1.0.0"]
+
+    # Served from memory, even if the backend lost it
+    backend.path("b").unlink()
+    assert export_cache.get("b") == ["bar==1.0.0"]
+
+
+def test_memory_export_cache__evict():
+    export_cache = cache.MemoryExportCache(max_entries=2)
+    export_cache.set("a", ["a"])
+    export_cache.set("b", ["b"])
+    export_cache.set("c", ["c"])
+    # "a" is the most recently used
+    export_cache.get("a")
+
+    export_cache.evict()
+
+    assert list(export_cache.entries) == ["c", "a"]
+
+
+def test_lock_index(tmp_path: pathlib.Path, mocker):
+    lock_index = cache.LockIndex(tmp_path)
+    text = '[[package]]\nname = "foo"\nversion = "1.0.0"\n'
+    parse_lock = mocker.spy(lock, "parse_lock")
+
+    expected = {"package": [{"name": "foo", "version": "1.0.0"}]}
+    assert lock_index.parse(text) == expected
+    assert cache.LockIndex(tmp_path).parse(text) == expected
+    assert parse_lock.call_count == 1
+
+    # Keyed on the contents
+    assert lock_index.parse(text.replace("1.0.0", "2.0.0"))["package"][0] == {
+        "name": "foo",
+        "version": "2.0.0",
+    }
+    assert parse_lock.call_count == 2
+
+
+def test_lock_index__invalid_entry(tmp_path: pathlib.Path):
+    lock_index = cache.LockIndex(tmp_path)
+    text = '[[package]]\nname = "foo"\nversion = "1.0.0"\n'
+    lock_index.path(lock_index.get_key(text)).parent.mkdir(parents=True)
+    lock_index.path(lock_index.get_key(text)).write_bytes(b"foo")
+
+    assert lock_index.parse(text) == {"package": [{"name": "foo", "version": "1.0.0"}]}
+
+
+def test_memory_lock_index(tmp_path: pathlib.Path, mocker):
+    backend = cache.LockIndex(tmp_path)
+    lock_index = cache.MemoryLockIndex(backend=backend)
+    text = '[[package]]\nname = "foo"\nversion = "1.0.0"\n'
+    backend_parse = mocker.spy(backend, "parse")
+
+    expected = {"package": [{"name": "foo", "version": "1.0.0"}]}
+    assert lock_index.parse(text) == expected
+    # Served from memory, and the same object every time
+    assert lock_index.parse(text) is lock_index.parse(text)
+    assert backend_parse.call_count == 1
+
+
+def test_memory_lock_index__package_table(tmp_path: pathlib.Path, mocker):
+    backend = cache.LockIndex(tmp_path)
+    lock_index = cache.MemoryLockIndex(backend=backend, max_entries=1)
+    texts = [f'[[package]]\nname = "{name}"\nversion = "1.0.0"\n' for name in "ab"]
+    read_package_versions = mocker.spy(lock, "read_package_versions")
+
+    table = lock_index.get_package_table(texts[0])
+
+    assert table.get("a") == "1.0.0"
+    # Served from memory
+    assert lock_index.get_package_table(texts[0]) is table
+    assert read_package_versions.call_count == 1
+
+    lock_index.get_package_table(texts[1])
+    lock_index.evict()
+
+    # Only the most recently used table is kept
+    lock_index.get_package_table(texts[1])
+    assert read_package_versions.call_count == 2
+    lock_index.get_package_table(texts[0])
+    assert read_package_versions.call_count == 3
+
+
+def test_memory_lock_index__evict(mocker):
+    parse_lock = mocker.spy(lock, "parse_lock")
+    lock_index = cache.MemoryLockIndex(max_entries=1)
+    texts = [f'[[package]]\nname = "{name}"\nversion = "1.0.0"\n' for name in "ab"]
+    for text in texts:
+        lock_index.parse(text)
+
+    lock_index.evict()
+
+    # Only the most recently used entry is kept
+    lock_index.parse(texts[1])
+    assert parse_lock.call_count == 2
+    lock_index.parse(texts[0])
+    assert parse_lock.call_count == 3
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pathlib
+import socket
+import stat
+import threading
+
+import pytest
+
+from sync_pre_commit_with_uv import daemon, exceptions
+
+
+def test_request__no_server(tmp_path: pathlib.Path):
+    assert daemon.request(tmp_path / "s.sock", {"foo": "bar"}) is None
+
+
+def test_serve(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+    # Left over by a previous server
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as leftover:
+        leftover.bind(str(socket_path))
+
+    with daemon.serve(socket_path, lambda payload: {"echo": payload}) as server:
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        answer = daemon.request(socket_path, {"foo": "bar"})
+        thread.join()
+
+    assert answer == {"echo": {"foo": "bar"}}
+    assert not socket_path.exists()
+
+
+def test_serve__permissions(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+
+    with daemon.serve(socket_path, dict):
+        assert stat.S_IMODE(socket_path.lstat().st_mode) == 0o600
+
+
+def test_serve__not_a_socket(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+    socket_path.write_text("foo")
+
+    with (
+        pytest.raises(exceptions.NotASocket),
+        daemon.serve(socket_path, dict),
+    ):
+        pass
+
+    assert socket_path.read_text() == "foo"
+
+
+def test_serve__socket_replaced(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+
+    with (
+        socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as other,
+        daemon.serve(socket_path, dict),
+    ):
+        socket_path.unlink()
+        other.bind(str(socket_path))
+
+    assert socket_path.exists()
+
+
+def test_serve__timeout(tmp_path: pathlib.Path):
+    with daemon.serve(tmp_path / "s.sock", dict, timeout=0.01) as server:
+        server.handle_request()
+
+
+def test_serve__invalid_request(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+
+    with daemon.serve(socket_path, dict) as server:
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+        client = daemon.connect(socket_path)
+        assert client is not None
+        with client:
+            client.sendall(b"foo")
+            client.shutdown(daemon.socket.SHUT_WR)
+            assert client.recv(1) == b""
+        thread.join()
+
+
+def test_serve__already_running(tmp_path: pathlib.Path):
+    socket_path = tmp_path / "s.sock"
+
+    with (
+        daemon.serve(socket_path, dict),
+        pytest.raises(exceptions.DaemonAlreadyRunning),
+        daemon.serve(socket_path, dict),
+    ):
+        pass
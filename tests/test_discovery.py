@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pathlib
+
+from sync_pre_commit_with_uv import discovery
+
+
+def make_project(directory: pathlib.Path, uv_lock: bool = True) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "pyproject.toml").touch()
+    (directory / ".pre-commit-config.yaml").touch()
+    if uv_lock:
+        (directory / "uv.lock").touch()
+
+
+def test_discover_projects(tmp_path: pathlib.Path):
+    make_project(tmp_path / "b")
+    make_project(tmp_path / "a")
+    # Member of a uv workspace: uses the uv.lock of the workspace root
+    (tmp_path / "workspace").mkdir()
+    (tmp_path / "workspace" / "uv.lock").touch()
+    make_project(tmp_path / "workspace" / "member", uv_lock=False)
+    # No uv.lock at all
+    make_project(tmp_path / "orphan", uv_lock=False)
+    # Hidden directories are skipped
+    make_project(tmp_path / ".venv" / "lib")
+
+    assert list(discovery.discover_projects(tmp_path)) == [
+        discovery.Project(
+            pyproject_config=tmp_path / "a" / "pyproject.toml",
+            pre_commit_config=tmp_path / "a" / ".pre-commit-config.yaml",
+            uv_lock=tmp_path / "a" / "uv.lock",
+        ),
+        discovery.Project(
+            pyproject_config=tmp_path / "b" / "pyproject.toml",
+            pre_commit_config=tmp_path / "b" / ".pre-commit-config.yaml",
+            uv_lock=tmp_path / "b" / "uv.lock",
+        ),
+        discovery.Project(
+            pyproject_config=tmp_path / "workspace" / "member" / "pyproject.toml",
+            pre_commit_config=tmp_path
+            / "workspace"
+            / "member"
+            / ".pre-commit-config.yaml",
+            uv_lock=tmp_path / "workspace" / "uv.lock",
+        ),
+    ]
+
+
+def test_find_uv_lock__stops_at_root(tmp_path: pathlib.Path):
+    (tmp_path / "uv.lock").touch()
+    root = tmp_path / "root"
+    (root / "project").mkdir(parents=True)
+
+    assert discovery.find_uv_lock(root / "project", root=root) is None
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import pathlib
+import shutil
 import subprocess
 import sys
 
+import pytest
+
 from sync_pre_commit_with_uv import __main__ as cli
+from sync_pre_commit_with_uv import resolver, sync, toml
 
 
 def test_full_integration(tmp_path: pathlib.Path, monkeypatch):
@@ -69,3 +73,39 @@ additional_dependencies_uv_params = { pyright = ["--only-group", "types"] }
           - types-requests==2.31.0.20240125
           - urllib3==2.4.0
 """ == pre_commit_file.read_text()
+
+
+# Projects locked once with uv, so that the parity test doesn't depend on what
+# PyPI serves, nor on the Python version running it. "simple" has no markers nor
+# forks, "markers" has both.
+LOCKFILES = pathlib.Path(__file__).parent / "fixtures" / "lockfiles"
+
+PARITY_PARAMS = [
+    [],
+    ["--only-group", "a"],
+    ["--only-group=b"],
+    ["--only-dev"],
+    ["--group", "a", "--no-dev"],
+    ["--extra", "x"],
+    ["--all-groups", "--no-group", "b"],
+    ["--no-default-groups", "--all-extras"],
+]
+
+
+@pytest.mark.parametrize("fixture", ["simple", "markers"])
+def test_native_export_parity(tmp_path: pathlib.Path, fixture: str):
+    for name in ("pyproject.toml", "uv.lock"):
+        shutil.copy(LOCKFILES / fixture / name, tmp_path / name)
+    lock_resolver = resolver.LockResolver(
+        pyproject_config=toml.read_toml(tmp_path / "pyproject.toml"),
+        load_lock=lambda: toml.read_toml(tmp_path / "uv.lock"),
+    )
+
+    for params in PARITY_PARAMS:
+        expected = sync.uv_export([*params, "--frozen"], cwd=tmp_path)
+        native = lock_resolver.export(sync.normalize_uv_params(params))
+        # Whatever is computed natively must be what uv outputs
+        assert native is None or native == expected, params
+        if fixture == "simple":
+            # Without markers nor forks, everything is computed natively
+            assert native is not None, params
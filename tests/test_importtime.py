@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# Cumulative import time of the CLI module, in microseconds. Cold start of the
+# hook is dominated by imports, so this should only ever go down.
+IMPORT_TIME_BUDGET_US = 150_000
+
+HEAVY_MODULES = {"pydantic", "ruamel", "packaging"}
+
+
+def get_import_times(*args: str) -> dict[str, int]:
+    """
+    Run Python with -X importtime and return the cumulative import time of each
+    imported module, in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # Skip the header line, and any unrelated output
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def imported_heavy_modules(times: dict[str, int]) -> set[str]:
+    return {name for name in times if name.split(".")[0] in HEAVY_MODULES}
+
+
+def test_import_cli__no_heavy_modules():
+    times = get_import_times("-c", "import sync_pre_commit_with_uv.__main__")
+
+    assert "sync_pre_commit_with_uv.__main__" in times
+    assert imported_heavy_modules(times) == set()
+
+
+def test_import_cli__no_socket_modules():
+    times = get_import_times("-c", "import sync_pre_commit_with_uv.__main__")
+
+    # Only needed with --socket
+    assert {"sync_pre_commit_with_uv.daemon", "socket", "json"} & set(times) == set()
+
+
+def test_help__no_heavy_modules():
+    times = get_import_times("-m", "sync_pre_commit_with_uv", "--help")
+
+    assert imported_heavy_modules(times) == set()
+
+
+def test_import_cli__budget():
+    # Best of a few runs, to smooth out the noise
+    best = min(
+        get_import_times("-c", "import sync_pre_commit_with_uv.__main__")[
+            "sync_pre_commit_with_uv.__main__"
+        ]
+        for _ in range(3)
+    )
+    assert best < IMPORT_TIME_BUDGET_US
+
+
+def test_no_relevant_files__no_heavy_modules(tmp_path):
+    for name in ("pyproject.toml", ".pre-commit-config.yaml", "uv.lock"):
+        (tmp_path / name).touch()
+
+    times = get_import_times(
+        "-m",
+        "sync_pre_commit_with_uv",
+        "--pyproject-config",
+        str(tmp_path / "pyproject.toml"),
+        "README.md",
+    )
+
+    assert "sync_pre_commit_with_uv.sync" not in times
+    assert imported_heavy_modules(times) == set()
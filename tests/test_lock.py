@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pathlib
+
+from sync_pre_commit_with_uv import lock, toml
+
+UV_LOCK = """version = 1
+revision = 3
+requires-python = ">=3.11"
+
+[[package]]
+name = "black"
+version = "23.12.1"
+source = { registry = "https://pypi.org/simple" }
+dependencies = [
+    { name = "click" },
+]
+
+[[package]]
+name = "click"
+version = "8.1.7"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "myproject"
+source = { virtual = "." }
+
+[package.metadata]
+requires-dist = [{ name = "black" }]
+"""
+
+
+def test_scan_package_versions():
+    assert lock.scan_package_versions(UV_LOCK) == [
+        ("black", "23.12.1"),
+        ("click", "8.1.7"),
+    ]
+
+
+def test_scan_package_versions__unexpected_layout():
+    text = """[[package]]
+version = "23.12.1"
+name = "black"
+"""
+    assert lock.scan_package_versions(text) is None
+
+
+def test_scan_package_versions__same_as_full_parse():
+    text = (pathlib.Path(__file__).parents[1] / "uv.lock").read_text()
+
+    assert lock.scan_package_versions(text) == [
+        (package["name"], package["version"])
+        for package in toml.parse_toml(text)["package"]
+        if "version" in package
+    ]
+
+
+def test_parse_lock():
+    config = lock.parse_lock(
+        UV_LOCK
+        + """
+[[package]]
+name = "foo"
+version = "1.0.0"
+sdist = { url = "https://example.com/foo-1.0.0.tar.gz" }
+wheels = [{ url = "https://example.com/foo-1.0.0-py3-none-any.whl" }]
+"""
+    )
+
+    assert config["requires-python"] == ">=3.11"
+    assert config["package"][-1] == {"name": "foo", "version": "1.0.0"}
+    # Strings are interned
+    assert (
+        config["package"][0]["dependencies"][0]["name"] is config["package"][1]["name"]
+    )
+
+
+def test_package_table():
+    table = lock.PackageTable.from_text(UV_LOCK)
+
+    assert len(table) == 2
+    assert table.get("black") == "23.12.1"
+    # Looked up by canonicalized name
+    assert table.get("Click") == "8.1.7"
+    assert table.get("myproject") is None
+
+
+def test_package_table__forked():
+    table = lock.PackageTable([("numpy", "1.0.0"), ("numpy", "2.0.0")])
+
+    assert table.get("numpy") == "2.0.0"
+
+
+def test_parse_lock__same_as_full_parse():
+    text = (pathlib.Path(__file__).parents[1] / "uv.lock").read_text()
+    config = toml.parse_toml(text)
+    for package in config["package"]:
+        package.pop("sdist", None)
+        package.pop("wheels", None)
+
+    assert lock.parse_lock(text) == config
+    # Not the way uv writes it: fully parsed
+    assert lock.parse_lock(text.replace("[[package]]\n", "[[package]] \n")) == config
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import argparse
+import json
 import pathlib
+import threading
+import time
 
 import pytest
 
 from sync_pre_commit_with_uv import __main__ as main
-from sync_pre_commit_with_uv import exceptions
+from sync_pre_commit_with_uv import cache, daemon, discovery, exceptions, sync, watch
 
 
 def test_existing_path(tmp_path: pathlib.Path):
@@ -72,9 +75,14 @@ def test_parse_cli(tmp_path: pathlib.Path):
         ]
     )
     assert args == main.CliArgs(
-        pyproject_config=pyproject_config,
-        pre_commit_config=pre_commit_config,
-        uv_lock=uv_lock,
+        projects=[
+            discovery.Project(
+                pyproject_config=pyproject_config,
+                pre_commit_config=pre_commit_config,
+                uv_lock=uv_lock,
+            )
+        ],
+        cache_dir=cache.default_cache_dir(),
     )
 
 
@@ -97,9 +105,14 @@ def test_parse_cli__all_provided(tmp_path: pathlib.Path):
         ]
     )
     assert args == main.CliArgs(
-        pyproject_config=pyproject_config,
-        pre_commit_config=pre_commit_config,
-        uv_lock=uv_lock,
+        projects=[
+            discovery.Project(
+                pyproject_config=pyproject_config,
+                pre_commit_config=pre_commit_config,
+                uv_lock=uv_lock,
+            )
+        ],
+        cache_dir=cache.default_cache_dir(),
     )
 
 
@@ -109,3 +122,460 @@ def test_cli__error(tmp_path: pathlib.Path):
     pyproject_config.touch()
     with pytest.raises(SystemExit):
         main.cli(["--pyproject-config", str(pyproject_config)])
+
+
+def test_positive_int():
+    assert main.positive_int("3") == 3
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "foo"])
+def test_positive_int__invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        main.positive_int(value)
+
+
+def test_positive_float():
+    assert main.positive_float("0.1") == 0.1
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "foo", "nan"])
+def test_positive_float__invalid(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        main.positive_float(value)
+
+
+def test_parse_cli__jobs(tmp_path: pathlib.Path):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+
+    args = main.parse_cli(["--pyproject-config", str(pyproject_config), "-j", "4"])
+
+    assert args.jobs == 4
+
+
+def test_cli__verbose(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+    mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync",
+        return_value=sync.SyncSummary(updates=1),
+    )
+
+    main.cli(["--pyproject-config", str(pyproject_config), "--verbose"])
+
+    assert capsys.readouterr().out.startswith("1 update(s) applied")
+
+
+def test_cli__profile(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+    profile_json = tmp_path / "profile.json"
+    mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync",
+        return_value=sync.SyncSummary(updates=1),
+    )
+
+    main.cli(
+        [
+            "--pyproject-config",
+            str(pyproject_config),
+            "--no-cache",
+            "--profile",
+            "--profile-json",
+            str(profile_json),
+        ]
+    )
+
+    assert "sync project" in capsys.readouterr().out
+    assert "sync project" in json.loads(profile_json.read_text())["phases"]
+
+
+def test_parse_cli__cache(tmp_path: pathlib.Path):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+
+    args = main.parse_cli(
+        ["--pyproject-config", str(pyproject_config), "--cache-dir", "foo"]
+    )
+    assert args.cache_dir == pathlib.Path("foo")
+
+    args = main.parse_cli(["--pyproject-config", str(pyproject_config), "--no-cache"])
+    assert args.cache_dir is None
+
+
+def test_cli__up_to_date(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary()
+    )
+
+    main.cli(["--pyproject-config", str(pyproject_config)])
+    main.cli(["--pyproject-config", str(pyproject_config), "--verbose"])
+
+    assert sync_mock.call_count == 1
+    assert capsys.readouterr().out == (
+        "Nothing changed since the last successful sync.\n"
+    )
+
+    # A change in any of the files means syncing again
+    (tmp_path / "uv.lock").write_text("foo")
+    main.cli(["--pyproject-config", str(pyproject_config)])
+    assert sync_mock.call_count == 2
+
+
+def test_cli__no_cache(tmp_path: pathlib.Path, mocker):
+    pyproject_config = tmp_path / "pyproject.toml"
+    pyproject_config.touch()
+    (tmp_path / ".pre-commit-config.yaml").touch()
+    (tmp_path / "uv.lock").touch()
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary()
+    )
+
+    main.cli(["--pyproject-config", str(pyproject_config), "--no-cache"])
+    main.cli(["--pyproject-config", str(pyproject_config), "--no-cache"])
+
+    assert sync_mock.call_count == 2
+
+
+def make_project(directory: pathlib.Path) -> pathlib.Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / ".pre-commit-config.yaml").touch()
+    (directory / "uv.lock").touch()
+    pyproject_config = directory / "pyproject.toml"
+    pyproject_config.touch()
+    return pyproject_config
+
+
+def test_parse_cli__several_projects(tmp_path: pathlib.Path):
+    pyproject_a = make_project(tmp_path / "a")
+    pyproject_b = make_project(tmp_path / "b")
+
+    args = main.parse_cli(
+        ["--pyproject-config", str(pyproject_a), "--pyproject-config", str(pyproject_b)]
+    )
+
+    assert [project.pyproject_config for project in args.projects] == [
+        pyproject_a,
+        pyproject_b,
+    ]
+    assert args.projects[1].uv_lock == tmp_path / "b" / "uv.lock"
+
+
+def test_parse_cli__several_projects_with_explicit_paths(tmp_path: pathlib.Path):
+    pyproject_a = make_project(tmp_path / "a")
+    pyproject_b = make_project(tmp_path / "b")
+
+    with pytest.raises(SystemExit):
+        main.parse_cli(
+            [
+                "--pyproject-config",
+                str(pyproject_a),
+                "--pyproject-config",
+                str(pyproject_b),
+                "--uv-lock",
+                str(tmp_path / "a" / "uv.lock"),
+            ]
+        )
+
+
+def test_parse_cli__discover(tmp_path: pathlib.Path):
+    make_project(tmp_path / "a")
+    make_project(tmp_path / "b")
+
+    args = main.parse_cli(["--discover", str(tmp_path)])
+
+    assert [project.pyproject_config for project in args.projects] == [
+        tmp_path / "a" / "pyproject.toml",
+        tmp_path / "b" / "pyproject.toml",
+    ]
+
+
+def test_cli__several_projects(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_a = make_project(tmp_path / "a")
+    pyproject_b = make_project(tmp_path / "b")
+
+    def fake_sync(*, pyproject_path, **kwargs):
+        if pyproject_path == pyproject_b:
+            raise exceptions.PackageNotFound(pypi_name="foo")
+        return sync.SyncSummary(updates=1)
+
+    sync_mock = mocker.patch("sync_pre_commit_with_uv.sync.sync", side_effect=fake_sync)
+
+    with pytest.raises(SystemExit) as exc_info:
+        main.cli(["--discover", str(tmp_path), "--verbose"])
+
+    assert str(exc_info.value) == (
+        f"{pyproject_b}: {exceptions.PackageNotFound(pypi_name='foo')}"
+    )
+    assert capsys.readouterr().out.startswith(f"{pyproject_a}: 1 update(s) applied")
+
+    # Only the project that succeeded is up to date
+    main.cli(["--pyproject-config", str(pyproject_a)])
+    assert sync_mock.call_count == 2
+
+
+def test_cli__check(tmp_path: pathlib.Path, mocker):
+    pyproject_config = make_project(tmp_path)
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary(updates=2)
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        main.cli(["--pyproject-config", str(pyproject_config), "--check"])
+
+    assert str(exc_info.value) == (
+        f"{tmp_path / '.pre-commit-config.yaml'} is not in sync (2 update(s) needed)"
+    )
+    assert sync_mock.call_args.kwargs["check"] is True
+
+    # Not in sync: not stamped
+    sync_mock.return_value = sync.SyncSummary()
+    main.cli(["--pyproject-config", str(pyproject_config), "--check"])
+    assert sync_mock.call_count == 2
+
+
+def test_get_relevant_projects(tmp_path: pathlib.Path, monkeypatch):
+    project_a = discovery.Project(
+        *(tmp_path / "a" / name for name in ("p.toml", "pc.yaml", "uv.lock"))
+    )
+    project_b = discovery.Project(
+        *(tmp_path / "b" / name for name in ("p.toml", "pc.yaml", "uv.lock"))
+    )
+    projects = [project_a, project_b]
+    monkeypatch.chdir(tmp_path)
+
+    assert main.get_relevant_projects(projects, None) == projects
+    assert main.get_relevant_projects(projects, [pathlib.Path("b/uv.lock")]) == [
+        project_b
+    ]
+    assert main.get_relevant_projects(projects, [pathlib.Path("a/other.py")]) == []
+
+
+def test_parse_cli__files(tmp_path: pathlib.Path):
+    pyproject_config = make_project(tmp_path)
+
+    args = main.parse_cli(["--pyproject-config", str(pyproject_config), "foo.py"])
+    assert args.files == [pathlib.Path("foo.py")]
+
+    args = main.parse_cli(["--pyproject-config", str(pyproject_config)])
+    assert args.files is None
+
+    args = main.parse_cli(
+        ["--pyproject-config", str(pyproject_config), "--always-run", "foo.py"]
+    )
+    assert args.files is None
+
+
+def test_cli__no_relevant_files(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = make_project(tmp_path)
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary()
+    )
+
+    main.cli(["--pyproject-config", str(pyproject_config), "--verbose", "foo.py"])
+
+    assert sync_mock.call_count == 0
+    assert capsys.readouterr().out == "None of the project files changed.\n"
+
+    main.cli(["--pyproject-config", str(pyproject_config), str(pyproject_config)])
+    assert sync_mock.call_count == 1
+
+
+def test_encode_args(tmp_path: pathlib.Path, monkeypatch):
+    make_project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    args = main.parse_cli(["--cache-dir", "cache", "--check", "-j", "2", "foo.py"])
+
+    decoded = main.decode_args(json.loads(json.dumps(main.encode_args(args))))
+
+    # Paths are absolute, so that they can be used from another directory
+    assert decoded == args._replace(
+        projects=[
+            discovery.Project(*(tmp_path / path for path in project))
+            for project in args.projects
+        ],
+        cache_dir=tmp_path / "cache",
+        files=[tmp_path / "foo.py"],
+    )
+
+
+def test_cli__socket__no_server(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = make_project(tmp_path)
+    mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary(updates=1)
+    )
+
+    main.cli(
+        [
+            "--pyproject-config",
+            str(pyproject_config),
+            "--socket",
+            str(tmp_path / "s.sock"),
+            "--verbose",
+        ]
+    )
+
+    # Done locally
+    assert capsys.readouterr().out.startswith("1 update(s) applied")
+
+
+def test_cli__watch(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = make_project(tmp_path)
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary(updates=1)
+    )
+    uv_lock = tmp_path / "uv.lock"
+
+    def sleep(seconds):
+        if sync_mock.call_count == 1:
+            uv_lock.write_text("foo")
+        elif sync_mock.call_count == 2:
+            raise KeyboardInterrupt
+
+    mocker.patch("time.sleep", side_effect=sleep)
+
+    main.cli(
+        [
+            "--pyproject-config",
+            str(pyproject_config),
+            "--cache-dir",
+            str(tmp_path / "cache"),
+            "--watch",
+            "--verbose",
+        ]
+    )
+
+    assert sync_mock.call_count == 2
+    # The second sync reuses what the first one read
+    first_call, second_call = sync_mock.call_args_list
+    assert first_call.kwargs["files"] is second_call.kwargs["files"]
+    assert capsys.readouterr().out.count("1 update(s) applied") == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        exceptions.PreCommitConfigurationError(error="foo"),
+        # Not expected by run()
+        KeyError("foo"),
+    ],
+)
+def test_cli__watch__error(tmp_path: pathlib.Path, mocker, capsys, error):
+    pyproject_config = make_project(tmp_path)
+    pre_commit_config = tmp_path / ".pre-commit-config.yaml"
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync",
+        side_effect=[error, sync.SyncSummary(updates=1)],
+    )
+
+    def sleep(seconds):
+        if sync_mock.call_count == 1:
+            # The error is fixed
+            pre_commit_config.write_text("repos: []")
+        elif sync_mock.call_count == 2:
+            raise KeyboardInterrupt
+
+    mocker.patch("time.sleep", side_effect=sleep)
+
+    main.cli(
+        [
+            "--pyproject-config",
+            str(pyproject_config),
+            "--no-cache",
+            "--watch",
+            "--verbose",
+        ]
+    )
+
+    # Still watching after the error
+    assert sync_mock.call_count == 2
+    out, err = capsys.readouterr()
+    assert "foo" in err
+    assert "1 update(s) applied" in out
+
+
+def test_cli__watch__own_writes(tmp_path: pathlib.Path, mocker):
+    pyproject_config = make_project(tmp_path)
+    pre_commit_config = tmp_path / ".pre-commit-config.yaml"
+
+    def fake_sync(**kwargs):
+        pre_commit_config.write_text("foo")
+        return sync.SyncSummary(updates=1)
+
+    sync_mock = mocker.patch("sync_pre_commit_with_uv.sync.sync", side_effect=fake_sync)
+    mocker.patch("time.sleep", side_effect=[None, None, KeyboardInterrupt])
+
+    main.cli(["--pyproject-config", str(pyproject_config), "--no-cache", "--watch"])
+
+    # Rewriting the pre-commit configuration doesn't trigger another sync
+    assert sync_mock.call_count == 1
+
+
+def test_cli__watch__socket(tmp_path: pathlib.Path, mocker, capsys):
+    pyproject_config = make_project(tmp_path)
+    socket_path = tmp_path / "s.sock"
+    sync_mock = mocker.patch(
+        "sync_pre_commit_with_uv.sync.sync", return_value=sync.SyncSummary(updates=1)
+    )
+    served = threading.Event()
+    poll = watch.Watcher.poll
+
+    def stop_when_served(self):
+        if served.is_set():
+            raise KeyboardInterrupt
+        return poll(self)
+
+    mocker.patch.object(watch.Watcher, "poll", stop_when_served)
+
+    def client():
+        while (connection := daemon.connect(socket_path)) is None:
+            time.sleep(0.01)
+        connection.close()
+        # Clients of another version do the run themselves
+        assert daemon.request(socket_path, {"tool": "foo"}) == {}
+        main.cli(
+            [
+                "--pyproject-config",
+                str(pyproject_config),
+                "--no-cache",
+                "--socket",
+                str(socket_path),
+                "--verbose",
+            ]
+        )
+        served.set()
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    main.cli(
+        [
+            "--pyproject-config",
+            str(pyproject_config),
+            "--no-cache",
+            "--watch",
+            "--interval",
+            "0.01",
+            "--socket",
+            str(socket_path),
+        ]
+    )
+    thread.join()
+
+    # The client's run was done by the watching process
+    assert sync_mock.call_count == 2
+    first_call, second_call = sync_mock.call_args_list
+    assert first_call.kwargs["files"] is second_call.kwargs["files"]
+    assert capsys.readouterr().out.startswith("1 update(s) applied")
+    assert not socket_path.exists()
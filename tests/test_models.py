@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any, ClassVar
+
+import pytest
+
+from sync_pre_commit_with_uv import models
+
+
+class Hook(models.Model):
+    fields: ClassVar[dict[str, models.Field]] = {"id": models.Field(models.string)}
+    __slots__ = tuple(fields)
+
+
+class Repo(models.Model):
+    fields: ClassVar[dict[str, models.Field]] = {
+        "name": models.Field(models.string),
+        "enabled": models.Field(models.boolean, True),
+        "hooks": models.Field(models.list_of(models.model(Hook)), []),
+        "params": models.Field(
+            models.optional(
+                models.one_of(
+                    models.dict_of(models.list_of(models.string)),
+                    models.list_of(models.string),
+                )
+            ),
+            None,
+        ),
+    }
+    __slots__ = tuple(fields)
+
+
+def test_model():
+    repo: Any = Repo(name="foo", hooks=[{"id": "bar"}], unknown="ignored")
+
+    assert repo.name == "foo"
+    assert repo.enabled is True
+    assert repo.hooks == [Hook(id="bar")]
+    assert repo.params is None
+    assert not hasattr(repo, "unknown")
+
+
+def test_model__eq():
+    assert Repo(name="foo") == Repo(name="foo")
+    assert Repo(name="foo") != Repo(name="bar")
+    assert Hook(id="foo") != "foo"
+
+
+def test_model__repr():
+    assert repr(Hook(id="foo")) == "Hook(id='foo')"
+
+
+def test_model__slots():
+    with pytest.raises(AttributeError):
+        Hook(id="foo").unknown = 1  # pyright: ignore[reportAttributeAccessIssue]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "message"),
+    [
+        ({}, "name\n  Field required"),
+        ({"name": 1}, "name\n  Input should be a valid string [input_value=1]"),
+        ({"name": "foo", "enabled": "yes"}, "Input should be a valid boolean"),
+        ({"name": "foo", "hooks": {}}, "Input should be a valid list"),
+        ({"name": "foo", "hooks": [1]}, "Input should be a dictionary or Hook"),
+        ({"name": "foo", "hooks": [{}]}, "validation error(s) for Hook"),
+        (
+            {"name": "foo", "params": 1},
+            "Input should be a valid dictionary or Input should be a valid list",
+        ),
+        ({"name": "foo", "params": {"a": [1]}}, "Input should be a valid"),
+    ],
+)
+def test_model__validation_error(kwargs, message):
+    with pytest.raises(models.ValidationError) as exc_info:
+        Repo(**kwargs)
+
+    assert str(exc_info.value).startswith("1 validation error(s) for Repo\n")
+    assert message in str(exc_info.value)
+
+
+def test_model__several_errors():
+    with pytest.raises(models.ValidationError) as exc_info:
+        Repo(name=1, enabled=1)
+
+    assert len(exc_info.value.errors) == 2
+
+
+@pytest.mark.parametrize(
+    ("value", "valid"),
+    [(1, True), (0, False), (-1, False), (True, False), ("1", False)],
+)
+def test_positive_int(value, valid):
+    if valid:
+        assert models.positive_int(value) == value
+    else:
+        with pytest.raises(models.FieldError):
+            models.positive_int(value)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import pathlib
+
+import pytest
+
+from sync_pre_commit_with_uv import profiling
+
+
+def test_profile__span():
+    profile = profiling.Profile()
+
+    with profile.span("parse"):
+        pass
+    with pytest.raises(ValueError), profile.span("parse"):
+        raise ValueError
+    with profile.span(profiling.UV_EXPORT, params="--group dev"):
+        pass
+
+    assert [(span.name, span.labels) for span in profile.spans] == [
+        ("parse", {}),
+        ("parse", {}),
+        (profiling.UV_EXPORT, {"params": "--group dev"}),
+    ]
+    assert list(profile.get_phases()) == ["parse", profiling.UV_EXPORT]
+    assert profile.get_phases()["parse"][0] == 2
+
+
+def test_profile__span_decorator():
+    profile = profiling.Profile()
+
+    @profile.span("work")
+    def work(value):
+        return value * 2
+
+    assert work(2) == 4
+    assert work(3) == 6
+    assert profile.get_phases()["work"][0] == 2
+
+
+def get_profile() -> profiling.Profile:
+    profile = profiling.Profile()
+    profile.spans = [
+        profiling.Span(name="parse uv.lock", duration=0.002, labels={}),
+        profiling.Span(
+            name=profiling.HOOK_EXPORT,
+            duration=0.5,
+            labels={"repo": "https://github.com/foo/mypy", "hook_id": "mypy"},
+        ),
+        profiling.Span(
+            name=profiling.UV_EXPORT, duration=0.4, labels={"params": "--group a"}
+        ),
+    ]
+    return profile
+
+
+def test_profile__report():
+    report = get_profile().report()
+
+    assert "parse uv.lock                         1       2.0 ms" in report
+    assert "https://github.com/foo/mypy mypy" in report
+    assert report.endswith("uv export subprocesses: 1")
+
+
+def test_profile__write_json(tmp_path: pathlib.Path):
+    path = tmp_path / "profile.json"
+
+    get_profile().write_json(path)
+
+    assert json.loads(path.read_text()) == {
+        "phases": {
+            "parse uv.lock": {"count": 1, "total": 0.002},
+            "export": {"count": 1, "total": 0.5},
+            "uv export": {"count": 1, "total": 0.4},
+        },
+        "hooks": [
+            {"repo": "https://github.com/foo/mypy", "hook_id": "mypy", "duration": 0.5}
+        ],
+        "uv_export_calls": [{"params": "--group a", "duration": 0.4}],
+    }
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import pytest
+
+from sync_pre_commit_with_uv import resolver
+
+
+def registry_package(name, **kwargs):
+    return {
+        "name": name,
+        "version": "1.0.0",
+        "source": {"registry": "https://pypi.org/simple"},
+        **kwargs,
+    }
+
+
+LOCK = {
+    "package": [
+        {
+            "name": "proj",
+            "version": "0.1.0",
+            "source": {"editable": "."},
+            "dependencies": [{"name": "a"}],
+            "optional-dependencies": {"fmt": [{"name": "b", "extra": ["x"]}]},
+            "dev-dependencies": {
+                "dev": [{"name": "c"}],
+                "typing": [{"name": "d"}],
+                "lint": [{"name": "e", "marker": "sys_platform == 'win32'"}],
+                "fork": [{"name": "f", "version": "1.0.0"}],
+                "local": [{"name": "g"}],
+            },
+        },
+        registry_package("a", dependencies=[{"name": "d"}]),
+        registry_package("b", **{"optional-dependencies": {"x": [{"name": "c"}]}}),
+        registry_package("c"),
+        registry_package("d"),
+        registry_package("e"),
+        registry_package("f"),
+        registry_package("f"),
+        {"name": "g", "version": "1.0.0", "source": {"directory": "../g"}},
+    ]
+}
+
+AVAILABLE = {
+    "available_groups": {"dev", "typing"},
+    "available_extras": {"fmt"},
+}
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ((), resolver.Selection(project=True, groups={"dev"}, extras=set())),
+        (
+            ("--group", "typing"),
+            resolver.Selection(project=True, groups={"dev", "typing"}, extras=set()),
+        ),
+        (
+            ("--only-group", "typing"),
+            resolver.Selection(project=False, groups={"typing"}, extras=set()),
+        ),
+        (
+            ("--only-dev",),
+            resolver.Selection(project=False, groups={"dev"}, extras=set()),
+        ),
+        (("--no-dev",), resolver.Selection(project=True, groups=set(), extras=set())),
+        (
+            ("--all-groups", "--no-group", "dev"),
+            resolver.Selection(project=True, groups={"typing"}, extras=set()),
+        ),
+        (
+            ("--no-default-groups", "--all-extras"),
+            resolver.Selection(project=True, groups=set(), extras={"fmt"}),
+        ),
+        (
+            ("--extra", "fmt"),
+            resolver.Selection(project=True, groups={"dev"}, extras={"fmt"}),
+        ),
+        # Not supported, or rejected by uv
+        (("--frozen",), None),
+        (("--group",), None),
+        (("--group", "unknown"), None),
+        (("--extra", "unknown"), None),
+        (("--only-group", "typing", "--extra", "fmt"), None),
+        (("--only-dev", "--group", "typing"), None),
+    ],
+)
+def test_parse_selection(params, expected):
+    selection = resolver.parse_selection(params, default_groups=["dev"], **AVAILABLE)
+    assert selection == expected
+
+
+def test_parse_selection__default_groups():
+    assert resolver.parse_selection(
+        (), default_groups=None, **AVAILABLE
+    ) == resolver.Selection(project=True, groups={"dev", "typing"}, extras=set())
+    assert resolver.parse_selection(
+        (), default_groups=["missing"], **AVAILABLE
+    ) == resolver.Selection(project=True, groups=set(), extras=set())
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ((), True),
+        (("--group", "dev", "--all-extras"), True),
+        (("--group",), False),
+        (("--frozen",), False),
+    ],
+)
+def test_is_supported(params, expected):
+    assert resolver.is_supported(params) is expected
+
+
+def test_lock_resolver__unsupported_params_dont_load_lock():
+    def load_lock():
+        raise AssertionError("Should not be loaded")
+
+    lock_resolver = resolver.LockResolver(
+        pyproject_config={"project": {"name": "proj"}}, load_lock=load_lock
+    )
+
+    assert lock_resolver.export(("--frozen",)) is None
+
+
+def get_resolver(pyproject_config=None):
+    return resolver.LockResolver(
+        pyproject_config={"project": {"name": "Proj"}}
+        if pyproject_config is None
+        else pyproject_config,
+        load_lock=lambda: LOCK,
+    )
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ((), {"a", "c", "d"}),
+        (("--only-group", "typing"), {"d"}),
+        (("--no-default-groups", "--extra", "fmt"), {"a", "b", "c", "d"}),
+        (("--no-dev",), {"a", "d"}),
+        # Conditional dependency
+        (("--only-group", "lint"), None),
+        # Forked package
+        (("--only-group", "fork"), None),
+        # Not from a registry
+        (("--only-group", "local"), None),
+    ],
+)
+def test_lock_resolver__get_package_names(params, expected):
+    assert get_resolver().get_package_names(params) == expected
+
+
+def test_lock_resolver__export():
+    lock_resolver = get_resolver()
+
+    assert lock_resolver.export(()) == ["a==1.0.0", "c==1.0.0", "d==1.0.0"]
+    assert lock_resolver.export(("--only-group", "lint")) is None
+    # Closures are computed once per group
+    assert lock_resolver.closures[("group", "dev")] == {"c"}
+    assert lock_resolver.closures[("group", "lint")] is None
+
+
+@pytest.mark.parametrize(
+    ("sys_platform", "expected"), [("win32", ["e==1.0.0"]), ("linux", [])]
+)
+def test_lock_resolver__environment(sys_platform, expected):
+    lock_resolver = resolver.LockResolver(
+        pyproject_config={"project": {"name": "proj"}},
+        load_lock=lambda: LOCK,
+        environment={"sys_platform": sys_platform},
+    )
+
+    assert lock_resolver.export(("--only-group", "lint")) == expected
+
+
+@pytest.mark.parametrize(
+    ("marker", "expected"),
+    [
+        ("sys_platform == 'win32'", True),
+        ("sys_platform == 'linux' and python_full_version >= '3.10'", False),
+        ("extra == 'group-4-proj-x'", None),
+        ("not a marker", None),
+    ],
+)
+def test_evaluate_marker(marker, expected):
+    environment = resolver.freeze_environment({"sys_platform": "win32"})
+    assert resolver.evaluate_marker(marker, environment) is expected
+
+
+def test_lock_resolver__virtual_workspace_root():
+    assert get_resolver(pyproject_config={}).get_package_names(()) is None
+
+
+def upgrade(lock, name):
+    return {
+        **lock,
+        "package": [
+            {**package, "version": "2.0.0"} if package["name"] == name else package
+            for package in lock["package"]
+        ],
+    }
+
+
+def test_lock_resolver__get_footprint():
+    params = ("--only-group", "typing")
+    footprint = get_resolver().get_footprint(params)
+    assert footprint is not None
+
+    def get_footprint(lock, params=params):
+        return resolver.LockResolver(
+            pyproject_config={"project": {"name": "proj"}}, load_lock=lambda: lock
+        ).get_footprint(params)
+
+    # "a" is not needed by the typing group
+    assert get_footprint(upgrade(LOCK, "a")) == footprint
+    assert get_footprint(upgrade(LOCK, "d")) != footprint
+    assert get_footprint(upgrade(LOCK, "a"), params=()) != get_footprint(
+        LOCK, params=()
+    )
+    assert get_footprint({**LOCK, "requires-python": ">=3.9"}) != footprint
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        # Through the extra of b
+        (("--no-default-groups", "--extra", "fmt"), "c"),
+        # Markers and forks are supported
+        (("--only-group", "lint"), "e"),
+        (("--only-group", "fork"), "f"),
+    ],
+)
+def test_lock_resolver__get_footprint__dependencies(params, expected):
+    assert get_resolver().get_footprint(params) != resolver.LockResolver(
+        pyproject_config={"project": {"name": "proj"}},
+        load_lock=lambda: upgrade(LOCK, expected),
+    ).get_footprint(params)
+
+
+def test_lock_resolver__get_footprint__not_supported():
+    assert get_resolver().get_footprint(("--frozen",)) is None
+    assert get_resolver(pyproject_config={}).get_footprint(()) is None
+
+
+def test_lock_resolver__default_groups():
+    lock_resolver = get_resolver(
+        {"project": {"name": "proj"}, "tool": {"uv": {"default-groups": "all"}}}
+    )
+    assert lock_resolver.default_groups is None
+
+
+def test_lock_resolver__lazy():
+    def load_lock():
+        raise AssertionError("Should not be loaded")
+
+    resolver.LockResolver(pyproject_config={}, load_lock=load_lock)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pathlib
+
+from sync_pre_commit_with_uv import stamp
+
+
+def test_get_tool_identity():
+    assert stamp.get_tool_identity() == stamp.get_tool_identity()
+
+
+def test_compute_stamp(tmp_path: pathlib.Path):
+    file = tmp_path / "foo"
+    file.write_text("foo")
+    first = stamp.compute_stamp([file])
+
+    file.write_text("bar")
+    assert stamp.compute_stamp([file]) != first
+
+
+def test_get_stamp_path(tmp_path: pathlib.Path):
+    assert stamp.get_stamp_path(tmp_path, tmp_path / "a") != stamp.get_stamp_path(
+        tmp_path, tmp_path / "b"
+    )
+
+
+def test_is_up_to_date(tmp_path: pathlib.Path):
+    cache_dir = tmp_path / "cache"
+    pre_commit_path = tmp_path / ".pre-commit-config.yaml"
+    pre_commit_path.write_text("repos: []")
+    kwargs = {
+        "cache_dir": cache_dir,
+        "pre_commit_path": pre_commit_path,
+        "paths": [pre_commit_path],
+    }
+
+    assert stamp.is_up_to_date(**kwargs) is False
+    stamp.write_stamp(**kwargs)
+    assert stamp.is_up_to_date(**kwargs) is True
+
+    pre_commit_path.write_text("repos: [] ")
+    assert stamp.is_up_to_date(**kwargs) is False
+
+
+def test_is_up_to_date__missing_file(tmp_path: pathlib.Path):
+    pre_commit_path = tmp_path / ".pre-commit-config.yaml"
+    pre_commit_path.write_text("repos: []")
+    kwargs = {
+        "cache_dir": tmp_path / "cache",
+        "pre_commit_path": pre_commit_path,
+        "paths": [pre_commit_path, tmp_path / "missing"],
+    }
+    stamp.write_stamp(**kwargs)
+    assert stamp.is_up_to_date(**kwargs) is False
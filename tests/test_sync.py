@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import pathlib
+import threading
+import time
 
 import pytest
 
-from sync_pre_commit_with_uv import exceptions, sync
+from sync_pre_commit_with_uv import (
+    cache,
+    discovery,
+    exceptions,
+    lock,
+    profiling,
+    resolver,
+    sync,
+    toml,
+)
 
 from . import factories
 
 
-def test_sync_config__update_revision_prefix():
+def test_get_updates__update_revision_prefix():
     # Test that revision is updated when locked_package exists
     repo_config = factories.RepoConfigFactory(
         username="foo",
@@ -18,12 +29,14 @@ def test_sync_config__update_revision_prefix():
         locked_package__version="2.0.0",
     )
 
-    result = list(sync.sync_config([repo_config], uv_export=lambda params: []))
+    result = list(sync.get_updates([repo_config], uv_export=lambda params: []))
 
-    assert result == [sync.UpdateRev(repo="https://github.com/foo/bar", value="v2.0.0")]
+    assert result == [
+        sync.UpdateRev(repo="https://github.com/foo/bar", position=0, value="v2.0.0")
+    ]
 
 
-def test_sync_config__update_revision_no_prefix():
+def test_get_updates__update_revision_no_prefix():
     # Test that revision is updated when locked_package exists
     repo_config = factories.RepoConfigFactory(
         username="foo",
@@ -33,12 +46,14 @@ def test_sync_config__update_revision_no_prefix():
         locked_package__version="2.0.0",
     )
 
-    result = list(sync.sync_config([repo_config], uv_export=lambda params: []))
+    result = list(sync.get_updates([repo_config], uv_export=lambda params: []))
 
-    assert result == [sync.UpdateRev(repo="https://github.com/foo/bar", value="2.0.0")]
+    assert result == [
+        sync.UpdateRev(repo="https://github.com/foo/bar", position=0, value="2.0.0")
+    ]
 
 
-def test_sync_config_no_sync_revision():
+def test_get_updates_no_sync_revision():
     # Test that revision is not updated when sync_revision is False
     repo_config = factories.RepoConfigFactory(
         version="1.0.0",
@@ -46,22 +61,22 @@ def test_sync_config_no_sync_revision():
         pyproject__sync_revision=False,
     )
 
-    result = list(sync.sync_config([repo_config], uv_export=lambda params: []))
+    result = list(sync.get_updates([repo_config], uv_export=lambda params: []))
 
     assert result == []
 
 
-def test_sync_config_raises_when_package_not_found():
+def test_get_updates_raises_when_package_not_found():
     # Test that exception is raised when locked_package doesn't exist and fail_if_not_found is True
     repo_config = factories.RepoConfigFactory(
         locked_package=None,
     )
 
     with pytest.raises(exceptions.PackageNotFound):
-        list(sync.sync_config([repo_config], uv_export=lambda params: []))
+        list(sync.get_updates([repo_config], uv_export=lambda params: []))
 
 
-def test_sync_config_no_raise_when_fail_if_not_found_false():
+def test_get_updates_no_raise_when_fail_if_not_found_false():
     # Test that no exception is raised when locked_package doesn't exist but fail_if_not_found is False
 
     repo_config = factories.RepoConfigFactory(
@@ -70,10 +85,10 @@ def test_sync_config_no_raise_when_fail_if_not_found_false():
     )
 
     # This should not raise an exception
-    list(sync.sync_config([repo_config], uv_export=lambda params: []))
+    list(sync.get_updates([repo_config], uv_export=lambda params: []))
 
 
-def test_sync_config_with_list_params():
+def test_get_updates_with_list_params():
     # Test that dependencies are updated when additional_dependencies_uv_params is a list
     repo_config = factories.RepoConfigFactory(
         username="foo",
@@ -89,18 +104,19 @@ def test_sync_config_with_list_params():
             return ["package1==1.0.0", "package2==2.0.0"]
         return []
 
-    result = list(sync.sync_config([repo_config], uv_export=fake_uv_export))
+    result = list(sync.get_updates([repo_config], uv_export=fake_uv_export))
 
     assert result == [
         sync.UpdateAdditionalDependencies(
             repo="https://github.com/foo/bar",
+            position=0,
             hook_id="bar",
             value=["package1==1.0.0", "package2==2.0.0"],
         )
     ]
 
 
-def test_sync_config_with_dict_params():
+def test_get_updates_with_dict_params():
     # Test that dependencies are updated only for hooks whose IDs are in the dict
     repo_config = factories.RepoConfigFactory(
         username="foo",
@@ -122,23 +138,25 @@ def test_sync_config_with_dict_params():
             return ["package3==3.0.0"]
         return []
 
-    result = list(sync.sync_config([repo_config], uv_export=fake_uv_export))
+    result = list(sync.get_updates([repo_config], uv_export=fake_uv_export))
 
     assert result == [
         sync.UpdateAdditionalDependencies(
             repo="https://github.com/foo/bar",
+            position=0,
             hook_id="hook1",
             value=["package1==1.0.0", "package2==2.0.0"],
         ),
         sync.UpdateAdditionalDependencies(
             repo="https://github.com/foo/bar",
+            position=0,
             hook_id="hook2",
             value=["package3==3.0.0"],
         ),
     ]
 
 
-def test_sync_config_with_dict_params_skip_undefined_hook():
+def test_get_updates_with_dict_params_skip_undefined_hook():
     # Test that hooks not defined in additional_dependencies_uv_params are skipped
     repo_config = factories.RepoConfigFactory(
         username="foo",
@@ -157,17 +175,176 @@ def test_sync_config_with_dict_params_skip_undefined_hook():
             return ["package1==1.0.0"]
         return []  # Should never be called for hook2
 
-    result = list(sync.sync_config([repo_config], uv_export=fake_uv_export))
+    result = list(sync.get_updates([repo_config], uv_export=fake_uv_export))
 
     assert result == [
         sync.UpdateAdditionalDependencies(
             repo="https://github.com/foo/bar",
+            position=0,
             hook_id="hook1",
             value=["package1==1.0.0"],
         ),
     ]
 
 
+def test_prefetch_uv_exports__concurrent():
+    # Exports run in parallel, but updates come out in the mapping order.
+    repo_configs = [
+        factories.RepoConfigFactory(
+            username="foo",
+            project_name=name,
+            pyproject__sync_revision=False,
+            pyproject__additional_dependencies_uv_params=["--group", name],
+        )
+        for name in ["slow", "fast"]
+    ]
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        # Fails unless both exports are running at the same time
+        barrier.wait()
+        if params == ["--group", "slow"]:
+            time.sleep(0.05)
+        return [f"{params[1]}==1.0.0"]
+
+    with sync.prefetch_uv_exports(
+        uv_export=fake_uv_export,
+        params_list=[["--group", "slow"], ["--group", "fast"]],
+        jobs=2,
+    ) as export:
+        result = list(sync.get_updates(repo_configs, uv_export=export))
+
+    assert result == [
+        sync.UpdateAdditionalDependencies(
+            repo="https://github.com/foo/slow",
+            position=0,
+            hook_id="slow",
+            value=["slow==1.0.0"],
+        ),
+        sync.UpdateAdditionalDependencies(
+            repo="https://github.com/foo/fast",
+            position=0,
+            hook_id="fast",
+            value=["fast==1.0.0"],
+        ),
+    ]
+
+
+def test_concurrent_uv_export__deduplicates():
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return ["package==1.0.0"]
+
+    summary = sync.SyncSummary()
+    with sync.concurrent_uv_export(
+        uv_export=fake_uv_export,
+        params_list=[["--group", "a"], ["--group=a"], ["--group", "b"]],
+        max_workers=1,
+        summary=summary,
+    ) as export:
+        first = export(["--group", "a"])
+        second = export(["--group=a"])
+        export(["--group", "b"])
+
+    assert first == second == ["package==1.0.0"]
+    assert calls == [["--group", "a"], ["--group", "b"]]
+    assert summary == sync.SyncSummary(uv_export_calls_saved=1)
+
+
+def test_prefetch_uv_exports__native_decision_in_pool():
+    lock_loaded = threading.Event()
+    checked = threading.Event()
+    exported = threading.Event()
+
+    def load_lock():
+        # Only returns once the export needing uv ran
+        assert exported.wait(timeout=5)
+        lock_loaded.set()
+        return {"package": [{"name": "proj", "source": {"virtual": "."}}]}
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        assert checked.wait(timeout=5)
+        exported.set()
+        return ["from-uv==1.0"]
+
+    lock_resolver = resolver.LockResolver(
+        pyproject_config={"project": {"name": "proj"}}, load_lock=load_lock
+    )
+    summary = sync.SyncSummary()
+    with sync.prefetch_uv_exports(
+        uv_export=fake_uv_export,
+        params_list=[["--all-groups"], ["--frozen"]],
+        jobs=2,
+        summary=summary,
+        lock_resolver=lock_resolver,
+    ) as export:
+        # Starting the exports didn't wait for uv.lock
+        assert not lock_loaded.is_set()
+        checked.set()
+        assert export(["--frozen"]) == ["from-uv==1.0"]
+        assert export(["--all-groups"]) == []
+
+    assert summary.uv_export_calls_native == 1
+
+
+def test_prefetch_uv_exports__deduplicates():
+    repo_configs = [
+        factories.RepoConfigFactory(
+            project_name=name,
+            pyproject__sync_revision=False,
+            pyproject__additional_dependencies_uv_params=["--group", "typing"],
+        )
+        for name in ["mypy", "basedpyright"]
+    ]
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return ["package==1.0.0"]
+
+    summary = sync.SyncSummary()
+    with sync.prefetch_uv_exports(
+        uv_export=sync.counted_uv_export(fake_uv_export, summary),
+        params_list=[["--group", "typing"]] * 2,
+        summary=summary,
+    ) as export:
+        result = list(sync.get_updates(repo_configs, uv_export=export))
+
+    assert [update.value for update in result] == [["package==1.0.0"]] * 2
+    assert calls == [["--group", "typing"]]
+    assert summary.uv_export_calls_saved == 1
+    assert summary.uv_export_calls == 1
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        (["--group", "typing"], ("--group", "typing")),
+        (["--group=typing"], ("--group", "typing")),
+        (["--all-groups", "-q"], ("--all-groups", "-q")),
+        (["--group=a=b"], ("--group", "a=b")),
+    ],
+)
+def test_normalize_uv_params(params, expected):
+    assert sync.normalize_uv_params(params) == expected
+
+
+def test_sync_summary__str():
+    summary = sync.SyncSummary(
+        updates=1,
+        uv_export_calls=2,
+        uv_export_calls_saved=3,
+        uv_export_cache_hits=4,
+        uv_export_calls_native=5,
+    )
+    assert str(summary) == (
+        "1 update(s) applied, 2 uv export call(s), 3 saved by deduplication, "
+        "5 computed from uv.lock, 4 served from cache"
+    )
+
+
 @pytest.mark.parametrize(
     ("repo_name", "pypi_package_name", "expected"),
     [
@@ -217,6 +394,44 @@ def test_from_pyproject_config(pyproject_config, expected_configs):
     assert configs == expected_configs
 
 
+def test_from_pyproject_config__skips_settings():
+    pyproject_config = {
+        "tool": {"sync-pre-commit-with-uv": {"jobs": 4, "black": {}}},
+    }
+    configs = list(sync.PyProjectRepoConfig.from_pyproject_config(pyproject_config))
+    assert configs == [sync.PyProjectRepoConfig(repo_name="black")]
+
+
+@pytest.mark.parametrize(
+    ("pyproject_config", "expected"),
+    [
+        ({}, sync.ToolSettings()),
+        (
+            {"tool": {"sync-pre-commit-with-uv": {"jobs": 4, "black": {}}}},
+            sync.ToolSettings(jobs=4),
+        ),
+        (
+            {
+                "tool": {
+                    "sync-pre-commit-with-uv": {
+                        "environment": {"sys_platform": "linux"}
+                    }
+                }
+            },
+            sync.ToolSettings(environment={"sys_platform": "linux"}),
+        ),
+    ],
+)
+def test_tool_settings__from_pyproject_config(pyproject_config, expected):
+    assert sync.ToolSettings.from_pyproject_config(pyproject_config) == expected
+
+
+def test_tool_settings__from_pyproject_config_validation_error():
+    pyproject_config = {"tool": {"sync-pre-commit-with-uv": {"jobs": 0}}}
+    with pytest.raises(exceptions.PyProjectConfigurationError):
+        sync.ToolSettings.from_pyproject_config(pyproject_config)
+
+
 def test_from_pyproject_config_validation_error():
     pyproject_config = {
         "tool": {
@@ -344,6 +559,19 @@ def test_from_uv_lock_config(uv_lock_config, expected_configs):
     assert configs == expected_configs
 
 
+def test_from_package_table():
+    table = lock.PackageTable([("black", "23.12.1"), ("django-stubs", "5.1.3")])
+
+    configs = list(
+        sync.UvLockPackageConfig.from_package_table(
+            table, names=["Django_Stubs", "ruff"]
+        )
+    )
+
+    # Named as requested, so that it can be matched with the configuration
+    assert configs == [sync.UvLockPackageConfig(name="Django_Stubs", version="5.1.3")]
+
+
 def test_map_repos_to_config_simple():
     expected_repo_config = factories.RepoConfigFactory()
 
@@ -400,30 +628,78 @@ def test_map_repos_to_config_missing_lock():
     ]
 
 
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"repos: [\n",
+        b"- repo: https://example.com\n",
+        b"",
+    ],
+)
+def test_load_pre_commit_config__invalid(content: bytes):
+    with pytest.raises(exceptions.PreCommitConfigurationError):
+        sync.load_pre_commit_config(content.decode())
+
+
+def test_yaml_check__not_utf8(tmp_path: pathlib.Path):
+    yaml_file = tmp_path / "test.yaml"
+    yaml_file.write_bytes(b"repos: \xff\n")
+
+    with pytest.raises(exceptions.InvalidFile), sync.yaml_check(yaml_file):
+        pass
+
+
 def test_yaml_roundtrip(tmp_path: pathlib.Path):
     yaml_file = tmp_path / "test.yaml"
     yaml_file.write_text("""repos:
   - repo: https://example.com
+    rev: v1.0.0  # bar
 
     hooks:  # foo
       - id: hook1
 """)
 
-    with sync.yaml_roundtrip(yaml_file) as config:
-        config["repos"][0]["hooks"][0]["id"] = "hook2"
+    with sync.yaml_roundtrip(yaml_file) as document:
+        document.apply(
+            sync.UpdateRev(repo="https://example.com", position=0, value="v2.0.0")
+        )
+        # Only the updates are applied to the file
+        document.data["repos"][0]["hooks"][0]["id"] = "hook2"
 
     assert (
         yaml_file.read_text()
         == """repos:
   - repo: https://example.com
+    rev: v2.0.0  # bar
 
     hooks:  # foo
-      - id: hook2
+      - id: hook1
 """
     )
 
 
-def test_yaml_roundtrip_no_changes(tmp_path: pathlib.Path):
+def test_yaml_roundtrip__patched(tmp_path: pathlib.Path):
+    yaml_file = tmp_path / "test.yaml"
+    # A dump would reindent this file
+    original_content = """repos:
+- repo: https://github.com/foo/bar
+  rev: v1.0.0
+  hooks:
+  - id: hook1
+"""
+    yaml_file.write_text(original_content)
+
+    with sync.yaml_roundtrip(yaml_file) as document:
+        document.apply(
+            sync.UpdateRev(
+                repo="https://github.com/foo/bar", position=0, value="v2.0.0"
+            )
+        )
+
+    assert yaml_file.read_text() == original_content.replace("v1.0.0", "v2.0.0")
+
+
+def test_yaml_roundtrip_no_changes(tmp_path: pathlib.Path, mocker):
     yaml_file = tmp_path / "test.yaml"
     original_content = """repos:
   - repo: https://example.com
@@ -432,10 +708,56 @@ def test_yaml_roundtrip_no_changes(tmp_path: pathlib.Path):
 """
     yaml_file.write_text(original_content)
 
+    yaml_class = mocker.spy(sync.ruamel.yaml, "YAML")
+
     with sync.yaml_roundtrip(yaml_file):
         pass
 
     assert yaml_file.read_text() == original_content
+    # The slow round-trip loader isn't needed
+    assert [call.kwargs for call in yaml_class.call_args_list] == [{"typ": "safe"}]
+
+
+def test_yaml_roundtrip_unchanged_update(tmp_path: pathlib.Path):
+    yaml_file = tmp_path / "test.yaml"
+    # The dump would reindent this file, but it should not be written at all
+    original_content = """repos:
+- repo: https://github.com/foo/bar
+  rev: v1.0.0
+  hooks:
+  - id: hook1
+"""
+    yaml_file.write_text(original_content)
+
+    with sync.yaml_roundtrip(yaml_file) as document:
+        changed = document.apply(
+            sync.UpdateRev(
+                repo="https://github.com/foo/bar", position=0, value="v1.0.0"
+            )
+        )
+
+    assert changed is False
+    assert document.changed is False
+    assert yaml_file.read_text() == original_content
+
+
+def test_render_pre_commit_config():
+    text = (
+        "repos:\r\n- repo: https://github.com/foo/bar\r\n  hooks:\r\n  - id: hook1\r\n"
+    )
+    document = sync.load_pre_commit_config(text)
+    # Adding a key can't be done with text edits
+    document.apply(
+        sync.UpdateRev(repo="https://github.com/foo/bar", position=0, value="v2.0.0")
+    )
+
+    assert sync.render_pre_commit_config(text, document) == (
+        "repos:\r\n"
+        "  - repo: https://github.com/foo/bar\r\n"
+        "    hooks:\r\n"
+        "      - id: hook1\r\n"
+        "    rev: v2.0.0\r\n"
+    )
 
 
 def test_update_rev__apply():
@@ -447,11 +769,13 @@ def test_update_rev__apply():
             }
         ]
     }
-    sync.UpdateRev(
+    changed = sync.UpdateRev(
         repo="https://github.com/foo/bar",
+        position=0,
         value="v2.0.0",
-    ).apply(config)
+    ).apply(sync.PreCommitIndex(config))
 
+    assert changed is True
     assert config == {
         "repos": [
             {
@@ -462,6 +786,52 @@ def test_update_rev__apply():
     }
 
 
+def test_update_rev__apply_duplicate_repo():
+    config = {
+        "repos": [
+            {"repo": "https://github.com/foo/bar", "rev": "v1.0.0"},
+            {"repo": "https://github.com/foo/baz", "rev": "v1.0.0"},
+            {"repo": "https://github.com/foo/bar", "rev": "1.0.0"},
+        ]
+    }
+    index = sync.PreCommitIndex(config)
+    # Each entry gets its own update, keeping its own prefix
+    sync.UpdateRev(repo="https://github.com/foo/bar", position=0, value="v2.0.0").apply(
+        index
+    )
+    sync.UpdateRev(repo="https://github.com/foo/bar", position=2, value="2.0.0").apply(
+        index
+    )
+
+    assert [repo["rev"] for repo in config["repos"]] == ["v2.0.0", "v1.0.0", "2.0.0"]
+
+
+def test_update_rev__apply_other_repo():
+    config = {"repos": [{"repo": "https://github.com/foo/baz", "rev": "v1.0.0"}]}
+
+    changed = sync.UpdateRev(
+        repo="https://github.com/foo/bar", position=0, value="v2.0.0"
+    ).apply(sync.PreCommitIndex(config))
+
+    assert changed is False
+    assert config["repos"][0]["rev"] == "v1.0.0"
+
+
+def test_pre_commit_index():
+    hook_1 = {"id": "hook1"}
+    hook_2 = {"id": "hook1"}
+    repo_1 = {"repo": "https://github.com/foo/bar", "hooks": [hook_1]}
+    repo_2 = {"repo": "https://github.com/foo/bar", "hooks": [hook_2]}
+
+    index = sync.PreCommitIndex({"repos": [repo_1, repo_2]})
+
+    assert index.repos == [repo_1, repo_2]
+    assert index.hooks == {(0, "hook1"): [hook_1], (1, "hook1"): [hook_2]}
+    assert index.get_repo(1, "https://github.com/foo/bar") is repo_2
+    assert index.get_repo(1, "https://github.com/foo/baz") is None
+    assert index.get_repo(2, "https://github.com/foo/bar") is None
+
+
 def test_update_addditional_dependencies__apply():
     config = {
         "repos": [
@@ -475,11 +845,14 @@ def test_update_addditional_dependencies__apply():
             }
         ]
     }
-    sync.UpdateAdditionalDependencies(
+    changed = sync.UpdateAdditionalDependencies(
         repo="https://github.com/foo/bar",
+        position=0,
         hook_id="hook1",
         value=["package1==1.0.0", "package2==2.0.0"],
-    ).apply(config)
+    ).apply(sync.PreCommitIndex(config))
+
+    assert changed is True
     assert config == {
         "repos": [
             {
@@ -498,6 +871,54 @@ def test_update_addditional_dependencies__apply():
     }
 
 
+def test_update_addditional_dependencies__apply_duplicate_repo():
+    config = {
+        "repos": [
+            {"repo": "https://github.com/foo/bar", "hooks": [{"id": "hook1"}]},
+            {"repo": "https://github.com/foo/bar", "hooks": [{"id": "hook2"}]},
+        ]
+    }
+    sync.UpdateAdditionalDependencies(
+        repo="https://github.com/foo/bar",
+        position=1,
+        hook_id="hook2",
+        value=["package1==1.0.0"],
+    ).apply(sync.PreCommitIndex(config))
+
+    assert config == {
+        "repos": [
+            {"repo": "https://github.com/foo/bar", "hooks": [{"id": "hook1"}]},
+            {
+                "repo": "https://github.com/foo/bar",
+                "hooks": [
+                    {"id": "hook2", "additional_dependencies": ["package1==1.0.0"]}
+                ],
+            },
+        ]
+    }
+
+
+def test_update_addditional_dependencies__apply_unchanged():
+    config = {
+        "repos": [
+            {
+                "repo": "https://github.com/foo/bar",
+                "hooks": [
+                    {"id": "hook1", "additional_dependencies": ["package1==1.0.0"]}
+                ],
+            }
+        ]
+    }
+    changed = sync.UpdateAdditionalDependencies(
+        repo="https://github.com/foo/bar",
+        position=0,
+        hook_id="hook1",
+        value=["package1==1.0.0"],
+    ).apply(sync.PreCommitIndex(config))
+
+    assert changed is False
+
+
 def test_sync(tmp_path: pathlib.Path):
     pre_commit_file = tmp_path / ".pre-commit-config.yaml"
     pyproject_file = tmp_path / "pyproject.toml"
@@ -524,13 +945,15 @@ name = "black"
 version = "23.12.1"
 """)
 
-    sync.sync(
+    summary = sync.sync(
         pre_commit_path=pre_commit_file,
         pyproject_path=pyproject_file,
         uv_lock_path=uv_lock_file,
         uv_export=lambda params: [],
     )
 
+    assert summary == sync.SyncSummary(updates=1)
+
     # Check that the pre-commit config was updated
     assert """repos:
   - repo: https://github.com/psf/black
@@ -540,6 +963,238 @@ version = "23.12.1"
 """ == pre_commit_file.read_text()
 
 
+def test_sync__duplicate_repo(tmp_path: pathlib.Path):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: v0.5.0
+    hooks:
+      - id: ruff
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: 0.5.0
+    hooks:
+      - id: ruff-format
+""")
+    pyproject_file.write_text("")
+    uv_lock_file.write_text("""[[package]]
+name = "ruff"
+version = "0.6.0"
+""")
+
+    summary = sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=lambda params: [],
+    )
+
+    assert summary.updates == 2
+    # Each entry keeps its own prefix
+    assert (
+        pre_commit_file.read_text()
+        == """repos:
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: v0.6.0
+    hooks:
+      - id: ruff
+  - repo: https://github.com/astral-sh/ruff-pre-commit
+    rev: 0.6.0
+    hooks:
+      - id: ruff-format
+"""
+    )
+
+
+def test_sync__exports_start_before_pre_commit_load(tmp_path: pathlib.Path, mocker):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+""")
+    pyproject_file.write_text("""[tool.sync-pre-commit-with-uv.mypy]
+sync_revision = false
+additional_dependencies_uv_params = ["--group", "types"]
+""")
+    uv_lock_file.write_text("")
+    exported = threading.Event()
+    yaml_roundtrip = sync.yaml_roundtrip
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        exported.set()
+        return ["foo==1.0"]
+
+    def slow_yaml_roundtrip(path: pathlib.Path, **kwargs):
+        assert exported.wait(timeout=5)
+        return yaml_roundtrip(path, **kwargs)
+
+    mocker.patch.object(sync, "yaml_roundtrip", slow_yaml_roundtrip)
+
+    summary = sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=fake_uv_export,
+    )
+
+    assert summary.updates == 1
+    assert summary.uv_export_calls == 1
+
+
+@pytest.mark.parametrize(
+    ("uv_params", "expected"),
+    [
+        (None, []),
+        (["--group", "a"], [["--group", "a"]]),
+        (
+            {"x": ["--group", "a"], "y": [], "z": ["--group", "b"]},
+            [["--group", "a"], []],
+        ),
+    ],
+)
+def test_get_uv_params(uv_params, expected):
+    config = sync.PyProjectRepoConfig(
+        repo_name="foo", additional_dependencies_uv_params=uv_params
+    )
+    pre_commit_text = """repos:
+  - repo: https://github.com/bar/foo.git
+    hooks:
+      - id: x
+      -   id: "y"
+  # - id: z
+"""
+    assert list(sync.get_uv_params([config], pre_commit_text)) == expected
+
+
+def test_get_uv_params__repo_not_in_pre_commit_config():
+    config = sync.PyProjectRepoConfig(
+        repo_name="mirrors-mypy", additional_dependencies_uv_params=["--group", "a"]
+    )
+    pre_commit_text = """repos:
+  - repo: https://github.com/pre-commit/pre-commit-hooks  # mirrors-mypy
+    hooks:
+      - id: mirrors-mypy
+"""
+    assert list(sync.get_uv_params([config], pre_commit_text)) == []
+
+
+def test_scan_pre_commit_config():
+    assert sync.scan_pre_commit_config("""repos:
+- repo: 'https://github.com/foo/bar'  # comment
+  hooks: [{id: flow}]
+  -   id: block
+""") == ({"bar"}, {"block"})
+
+
+def test_sync__unused_export(tmp_path: pathlib.Path):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/ruff
+    rev: v1.0
+    hooks:
+      - id: ruff
+""")
+    pyproject_file.write_text("""[tool.sync-pre-commit-with-uv.ruff]
+sync_revision = false
+
+[tool.sync-pre-commit-with-uv.mirrors-mypy]
+additional_dependencies_uv_params = ["--group", "typing"]
+""")
+    uv_lock_file.write_text("")
+
+    def failing_uv_export(params: list[str]) -> list[str]:
+        raise AssertionError("mirrors-mypy isn't in the pre-commit configuration")
+
+    summary = sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=failing_uv_export,
+    )
+
+    assert summary == sync.SyncSummary()
+
+
+def test_sync__profile(tmp_path: pathlib.Path):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+""")
+    pyproject_file.write_text("""[project]
+name = "proj"
+
+[tool.sync-pre-commit-with-uv.mypy]
+sync_revision = false
+additional_dependencies_uv_params = ["--group", "types"]
+""")
+    uv_lock_file.write_text("")
+    profile = profiling.Profile()
+
+    sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=lambda params: ["foo==1.0"],
+        profile=profile,
+    )
+
+    assert set(profile.get_phases()) == {
+        "parse pyproject.toml",
+        "validate configuration",
+        "parse uv.lock",
+        "load pre-commit config",
+        "load pre-commit config for round-trip",
+        "patch pre-commit config",
+        "read locked versions",
+        profiling.HOOK_EXPORT,
+        profiling.UV_EXPORT,
+        "dump pre-commit config",
+    }
+    assert [span.labels for span in profile.get_spans(profiling.UV_EXPORT)] == [
+        {"params": "--group types"}
+    ]
+
+
+def test_sync__check(tmp_path: pathlib.Path, mocker):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_content = """repos:
+  - repo: https://github.com/psf/black
+    rev: v1.0.0 # comment
+    hooks:
+      - id: black
+"""
+    pre_commit_file.write_text(pre_commit_content)
+    pyproject_file.write_text("")
+    uv_lock_file.write_text("""[[package]]
+name = "black"
+version = "23.12.1"
+""")
+    mocker.patch.object(sync, "yaml_roundtrip", side_effect=AssertionError)
+
+    summary = sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=lambda params: [],
+        check=True,
+    )
+
+    assert summary.updates == 1
+    assert pre_commit_file.read_text() == pre_commit_content
+
+
 def test_export_uv_config(fp):
     fp.register(
         [
@@ -555,3 +1210,627 @@ def test_export_uv_config(fp):
         stdout="""package1==1.0.0\npackage2==2.0.0\n""",
     )
     assert sync.uv_export(["--group=dev"]) == ["package1==1.0.0", "package2==2.0.0"]
+
+
+def test_export_uv_config__fails(fp):
+    fp.register(["uv", "export", fp.any()], returncode=2)
+
+    with pytest.raises(exceptions.UvExportError) as exc_info:
+        sync.uv_export(["--group=dev"])
+
+    assert str(exc_info.value) == "uv export --group=dev failed: exit status 2"
+
+
+def test_export_uv_config__uv_not_found(fp):
+    def not_found(process):
+        raise FileNotFoundError("uv")
+
+    fp.register(["uv", "export", fp.any()], callback=not_found)
+
+    with pytest.raises(exceptions.UvExportError):
+        sync.uv_export(["--group=dev"])
+
+
+def test_cached_uv_export(tmp_path: pathlib.Path):
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return ["package==1.0.0"]
+
+    export_cache = cache.ExportCache(tmp_path)
+    summary = sync.SyncSummary()
+    export = sync.cached_uv_export(
+        uv_export=fake_uv_export,
+        export_cache=export_cache,
+        inputs=[b"pyproject", b"lock"],
+        summary=summary,
+    )
+
+    assert export(["--group", "a"]) == ["package==1.0.0"]
+    assert export(["--group=a"]) == ["package==1.0.0"]
+    assert calls == [["--group", "a"]]
+    assert summary.uv_export_cache_hits == 1
+
+    # A different lock means a different key
+    other_export = sync.cached_uv_export(
+        uv_export=fake_uv_export,
+        export_cache=export_cache,
+        inputs=[b"pyproject", b"other lock"],
+    )
+    other_export(["--group", "a"])
+    assert len(calls) == 2
+
+
+def test_cached_uv_export__lock_resolver(tmp_path: pathlib.Path):
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return ["package==1.0.0"]
+
+    def get_export(versions: dict[str, str]) -> sync.UvExportProtocol:
+        lock = {
+            "package": [
+                {
+                    "name": "proj",
+                    "version": "0.1.0",
+                    "dev-dependencies": {
+                        "typing": [{"name": "a", "marker": "sys_platform == 'win32'"}]
+                    },
+                },
+                *({"name": name, "version": v} for name, v in versions.items()),
+            ]
+        }
+        return sync.cached_uv_export(
+            uv_export=fake_uv_export,
+            export_cache=cache.ExportCache(tmp_path),
+            inputs=[b"pyproject"],
+            uv_lock=str(versions).encode(),
+            lock_resolver=resolver.LockResolver(
+                pyproject_config={"project": {"name": "proj"}},
+                load_lock=lambda: lock,
+            ),
+        )
+
+    get_export({"a": "1.0.0", "b": "1.0.0"})(["--only-group", "typing"])
+    # Unrelated package upgraded: no need to run uv again
+    get_export({"a": "1.0.0", "b": "2.0.0"})(["--only-group", "typing"])
+    assert len(calls) == 1
+
+    get_export({"a": "2.0.0", "b": "2.0.0"})(["--only-group", "typing"])
+    assert len(calls) == 2
+
+    # Unsupported parameters: the whole uv.lock is part of the key
+    get_export({"a": "2.0.0", "b": "2.0.0"})(["--frozen"])
+    get_export({"a": "2.0.0", "b": "3.0.0"})(["--frozen"])
+    assert len(calls) == 4
+
+
+def test_sync__cache(tmp_path: pathlib.Path):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+""")
+    pyproject_file.write_text("""[tool.sync-pre-commit-with-uv.mypy]
+sync_revision = false
+additional_dependencies_uv_params = ["--group", "typing"]
+""")
+    uv_lock_file.write_text("")
+    export_cache = cache.ExportCache(tmp_path / "cache")
+
+    def run(uv_export):
+        return sync.sync(
+            pre_commit_path=pre_commit_file,
+            pyproject_path=pyproject_file,
+            uv_lock_path=uv_lock_file,
+            uv_export=uv_export,
+            export_cache=export_cache,
+        )
+
+    run(lambda params: ["package==1.0.0"])
+
+    def failing_uv_export(params: list[str]) -> list[str]:
+        raise AssertionError("Should have been cached")
+
+    summary = run(failing_uv_export)
+    assert summary.uv_export_cache_hits == 1
+    # uv didn't run
+    assert summary.uv_export_calls == 0
+
+
+def test_file_contents(tmp_path: pathlib.Path):
+    path = tmp_path / "file.txt"
+    path.write_text("foo")
+    files = sync.FileContents()
+    calls = []
+
+    def parser(text: str) -> str:
+        calls.append(text)
+        return text.upper()
+
+    assert files.parse(path, parser) == "FOO"
+    path.write_text("bar")
+    # Contents are read and parsed once, even through a different path
+    assert files.parse(tmp_path / "." / "file.txt", parser) == "FOO"
+    assert files.read_bytes(path) == b"foo"
+    assert calls == ["foo"]
+
+
+def test_file_contents__forget(tmp_path: pathlib.Path):
+    path = tmp_path / "file.txt"
+    path.write_text("foo")
+    files = sync.FileContents()
+    assert files.parse(path, str.upper) == "FOO"
+
+    path.write_text("bar")
+    files.forget([tmp_path / "." / "file.txt"])
+
+    assert files.parse(path, str.upper) == "BAR"
+    assert files.read_bytes(path) == b"bar"
+
+
+def test_file_contents__invalid(tmp_path: pathlib.Path):
+    path = tmp_path / "pyproject.toml"
+    path.write_text("[tool\n")
+    files = sync.FileContents()
+
+    with pytest.raises(exceptions.InvalidFile):
+        files.parse(path, toml.parse_toml)
+
+    path.write_bytes(b"\xff")
+    files.forget([path])
+
+    with pytest.raises(exceptions.InvalidFile):
+        files.parse(path, toml.parse_toml)
+
+
+def make_project(directory: pathlib.Path, uv_lock_file: pathlib.Path):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / ".pre-commit-config.yaml").write_text("""repos:
+  - repo: https://github.com/psf/black
+    rev: v1.0.0
+    hooks:
+      - id: black
+""")
+    (directory / "pyproject.toml").write_text("")
+    return discovery.Project(
+        pyproject_config=directory / "pyproject.toml",
+        pre_commit_config=directory / ".pre-commit-config.yaml",
+        uv_lock=uv_lock_file,
+    )
+
+
+def test_sync_many(tmp_path: pathlib.Path, mocker):
+    uv_lock_file = tmp_path / "uv.lock"
+    uv_lock_file.write_text("""[[package]]
+name = "black"
+version = "23.12.1"
+""")
+    project_a = make_project(tmp_path / "a", uv_lock_file)
+    project_b = make_project(tmp_path / "b", uv_lock_file)
+    # Broken configuration: the error is reported, the other project is synced
+    project_c = make_project(tmp_path / "c", uv_lock_file)
+    project_c.pyproject_config.write_text("[tool.sync-pre-commit-with-uv]\njobs = 0\n")
+    read_package_versions = mocker.spy(lock, "read_package_versions")
+
+    results = sync.sync_many(
+        projects=[project_a, project_b, project_c], uv_export=lambda params: []
+    )
+
+    assert results[:2] == [
+        sync.ProjectResult(project=project_a, summary=sync.SyncSummary(updates=1)),
+        sync.ProjectResult(project=project_b, summary=sync.SyncSummary(updates=1)),
+    ]
+    assert isinstance(results[2].error, exceptions.PyProjectConfigurationError)
+    assert "rev: v23.12.1" in project_b.pre_commit_config.read_text()
+    # The shared uv.lock is only parsed once
+    assert read_package_versions.call_count == 1
+
+
+def test_sync_many__invalid_files(tmp_path: pathlib.Path):
+    uv_lock_file = tmp_path / "uv.lock"
+    uv_lock_file.write_text("""[[package]]
+name = "black"
+version = "23.12.1"
+""")
+    project_a = make_project(tmp_path / "a", uv_lock_file)
+    project_b = make_project(tmp_path / "b", uv_lock_file)
+    project_b.pre_commit_config.write_text("repos: [\n")
+    project_c = make_project(tmp_path / "c", uv_lock_file)
+    project_c.pyproject_config.write_text("[tool\n")
+    project_d = make_project(tmp_path / "d", tmp_path / "d" / "uv.lock")
+    project_d.uv_lock.write_text("[[package]]\nname = \n")
+
+    results = sync.sync_many(
+        projects=[project_a, project_b, project_c, project_d],
+        uv_export=lambda params: [],
+    )
+
+    assert results[0] == sync.ProjectResult(
+        project=project_a, summary=sync.SyncSummary(updates=1)
+    )
+    assert isinstance(results[1].error, exceptions.PreCommitConfigurationError)
+    assert isinstance(results[2].error, exceptions.InvalidFile)
+    assert isinstance(results[3].error, exceptions.InvalidFile)
+
+
+def test_sync_many__uv_export_error(tmp_path: pathlib.Path, fp):
+    uv_lock_file = tmp_path / "uv.lock"
+    uv_lock_file.write_text("")
+    projects = [make_project(tmp_path / name, uv_lock_file) for name in "ab"]
+    for project in projects:
+        project.pyproject_config.write_text("""[tool.sync-pre-commit-with-uv.black]
+sync_revision = false
+additional_dependencies_uv_params = ["--frozen"]
+""")
+    fp.register(["uv", "export", fp.any()], returncode=2, occurrences=2)
+
+    results = sync.sync_many(projects=projects)
+
+    assert [type(result.error) for result in results] == [
+        exceptions.UvExportError,
+        exceptions.UvExportError,
+    ]
+
+
+def test_sync_many__jobs(tmp_path: pathlib.Path):
+    uv_lock_file = tmp_path / "uv.lock"
+    uv_lock_file.write_text("")
+    projects = []
+    for name in "abcd":
+        project = make_project(tmp_path / name, uv_lock_file)
+        project.pre_commit_config.write_text("""repos:
+  - repo: https://github.com/psf/black
+    hooks:
+      - id: black
+      - id: black-jupyter
+""")
+        project.pyproject_config.write_text("""[tool.sync-pre-commit-with-uv.black]
+sync_revision = false
+additional_dependencies_uv_params = { black = ["--frozen"], black-jupyter = ["-q"] }
+""")
+        projects.append(project)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return []
+
+    results = sync.sync_many(projects=projects, uv_export=fake_uv_export, jobs=2)
+
+    assert all(result.summary for result in results)
+    # The limit is shared between projects
+    assert max_running == 2
+
+
+def test_sync_many__shared_pre_commit_config(tmp_path: pathlib.Path):
+    project = make_project(tmp_path, tmp_path / "uv.lock")
+
+    with pytest.raises(exceptions.SharedPreCommitConfig):
+        sync.sync_many(projects=[project, project])
+
+
+def test_get_project_uv_export(tmp_path: pathlib.Path, mocker):
+    check_output = mocker.patch("subprocess.check_output", return_value="a==1.0\n")
+
+    assert sync.get_project_uv_export(tmp_path)(["--group=dev"]) == ["a==1.0"]
+    assert check_output.call_args.kwargs["cwd"] == tmp_path
+
+
+def test_native_uv_export():
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return ["from-uv==1.0"]
+
+    lock_resolver = resolver.LockResolver(
+        pyproject_config={"project": {"name": "proj"}},
+        load_lock=lambda: {
+            "package": [
+                {
+                    "name": "proj",
+                    "source": {"virtual": "."},
+                    "dev-dependencies": {"x": [{"name": "a"}]},
+                },
+                {
+                    "name": "a",
+                    "version": "1.0",
+                    "source": {"registry": "https://pypi.org/simple"},
+                },
+            ]
+        },
+    )
+    summary = sync.SyncSummary()
+    export = sync.native_uv_export(fake_uv_export, lock_resolver, summary=summary)
+
+    assert export(["--only-group=x"]) == ["a==1.0"]
+    assert export(["--frozen"]) == ["from-uv==1.0"]
+    assert calls == [["--frozen"]]
+    assert summary.uv_export_calls_native == 1
+
+
+def test_environment_uv_export():
+    def fake_uv_export(params: list[str]) -> list[str]:
+        return [
+            "a==1.0",
+            "b==2.0 ; sys_platform == 'win32'",
+            "c==3.0 ; sys_platform == 'linux'",
+            "d==4.0 ; extra == 'group-4-proj-x'",
+        ]
+
+    export = sync.environment_uv_export(
+        fake_uv_export, environment={"sys_platform": "linux"}
+    )
+
+    assert export([]) == ["a==1.0", "c==3.0", "d==4.0 ; extra == 'group-4-proj-x'"]
+
+
+def test_sync__native(tmp_path: pathlib.Path):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+      - id: mypy-strict
+""")
+    pyproject_file.write_text("""[project]
+name = "proj"
+
+[tool.sync-pre-commit-with-uv.mypy]
+sync_revision = false
+additional_dependencies_uv_params = { mypy = ["--only-group", "a"], mypy-strict = ["--only-group", "b"] }
+""")
+    uv_lock_file.write_text("""[[package]]
+name = "proj"
+version = "0.1.0"
+source = { virtual = "." }
+
+[package.dev-dependencies]
+a = [{ name = "foo" }]
+b = [{ name = "foo" }, { name = "bar" }]
+
+[[package]]
+name = "bar"
+version = "2.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "foo"
+version = "1.0"
+source = { registry = "https://pypi.org/simple" }
+""")
+    calls = []
+
+    def fake_uv_export(params: list[str]) -> list[str]:
+        calls.append(params)
+        return []
+
+    summary = sync.sync(
+        pre_commit_path=pre_commit_file,
+        pyproject_path=pyproject_file,
+        uv_lock_path=uv_lock_file,
+        uv_export=fake_uv_export,
+    )
+
+    assert calls == []
+    assert summary.uv_export_calls == 0
+    assert summary.uv_export_calls_native == 2
+    assert (
+        pre_commit_file.read_text()
+        == """repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+        additional_dependencies:
+          - foo==1.0
+      - id: mypy-strict
+        additional_dependencies:
+          - bar==2.0
+          - foo==1.0
+"""
+    )
+
+
+def test_sync__lock_index(tmp_path: pathlib.Path, mocker):
+    pre_commit_file = tmp_path / ".pre-commit-config.yaml"
+    pyproject_file = tmp_path / "pyproject.toml"
+    uv_lock_file = tmp_path / "uv.lock"
+    pre_commit_file.write_text("""repos:
+  - repo: https://github.com/foo/mypy
+    hooks:
+      - id: mypy
+""")
+    pyproject_file.write_text("""[project]
+name = "proj"
+
+[tool.sync-pre-commit-with-uv.mypy]
+sync_revision = false
+additional_dependencies_uv_params = ["--only-group", "a"]
+""")
+    uv_lock_file.write_text("""[[package]]
+name = "proj"
+version = "0.1.0"
+source = { virtual = "." }
+
+[package.dev-dependencies]
+a = [{ name = "foo" }]
+
+[[package]]
+name = "foo"
+version = "1.0"
+source = { registry = "https://pypi.org/simple" }
+""")
+    parse_lock = mocker.spy(lock, "parse_lock")
+
+    for _ in range(2):
+        summary = sync.sync(
+            pre_commit_path=pre_commit_file,
+            pyproject_path=pyproject_file,
+            uv_lock_path=uv_lock_file,
+            uv_export=lambda params: [],
+            lock_index=cache.LockIndex(tmp_path / "cache"),
+        )
+        assert summary.uv_export_calls_native == 1
+
+    # The second run reads the parsed uv.lock from the index
+    assert parse_lock.call_count == 1
+
+
+def test_memory_contents():
+    files = sync.MemoryContents({pathlib.Path("a.toml"): b"a = 1"})
+
+    assert files.parse(pathlib.Path("a.toml"), sync.toml.parse_toml) == {"a": 1}
+    with pytest.raises(exceptions.PathDoesNotExist):
+        files.read_bytes(pathlib.Path("b.toml"))
+
+
+PLAN_PYPROJECT = """[project]
+name = "proj"
+
+[tool.sync-pre-commit-with-uv.mypy]
+additional_dependencies_uv_params = ["--only-group", "a"]
+"""
+PLAN_PRE_COMMIT_CONFIG = """repos:
+  - repo: https://github.com/foo/mypy
+    rev: v0.9  # pinned
+    hooks:
+      - id: mypy
+"""
+PLAN_UV_LOCK = """[[package]]
+name = "proj"
+version = "0.1.0"
+source = { virtual = "." }
+
+[package.dev-dependencies]
+a = [{ name = "foo" }]
+
+[[package]]
+name = "foo"
+version = "1.0"
+source = { registry = "https://pypi.org/simple" }
+
+[[package]]
+name = "mypy"
+version = "1.0"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+
+def test_plan(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    result = sync.plan(
+        pyproject=PLAN_PYPROJECT,
+        pre_commit_config=PLAN_PRE_COMMIT_CONFIG.encode(),
+        uv_lock=PLAN_UV_LOCK,
+    )
+
+    assert result.updates == [
+        sync.UpdateRev(repo="https://github.com/foo/mypy", position=0, value="v1.0"),
+        sync.UpdateAdditionalDependencies(
+            repo="https://github.com/foo/mypy",
+            position=0,
+            hook_id="mypy",
+            value=["foo==1.0"],
+        ),
+    ]
+    assert (
+        result.pre_commit_config
+        == """repos:
+  - repo: https://github.com/foo/mypy
+    rev: v1.0  # pinned
+    hooks:
+      - id: mypy
+        additional_dependencies:
+          - foo==1.0
+"""
+    )
+    assert result.summary.updates == 2
+    # Nothing was read from or written to the current directory
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_plan__unchanged():
+    result = sync.plan(
+        pyproject=PLAN_PYPROJECT,
+        pre_commit_config=PLAN_PRE_COMMIT_CONFIG.replace("v0.9", "v1.0")
+        + """        additional_dependencies: [foo==1.0]
+""",
+        uv_lock=PLAN_UV_LOCK,
+    )
+
+    assert result.updates == []
+    assert "[foo==1.0]" in result.pre_commit_config
+
+
+def test_plan__export_not_available():
+    # foo is only needed on some platforms: uv is needed to resolve it
+    uv_lock = PLAN_UV_LOCK.replace(
+        'a = [{ name = "foo" }]',
+        """a = [{ name = "foo", marker = "sys_platform == 'win32'" }]""",
+    )
+
+    with pytest.raises(exceptions.ExportNotAvailable):
+        sync.plan(
+            pyproject=PLAN_PYPROJECT,
+            pre_commit_config=PLAN_PRE_COMMIT_CONFIG,
+            uv_lock=uv_lock,
+        )
+
+    result = sync.plan(
+        pyproject=PLAN_PYPROJECT,
+        pre_commit_config=PLAN_PRE_COMMIT_CONFIG,
+        uv_lock=uv_lock,
+        uv_export=lambda params: ["foo==1.0"],
+    )
+    assert result.summary.uv_export_calls == 1
+
+
+def test_plan__lock_index(mocker):
+    parse_lock = mocker.spy(lock, "parse_lock")
+    read_package_versions = mocker.spy(lock, "read_package_versions")
+    lock_index = cache.MemoryLockIndex()
+
+    for rev in ["v0.8", "v0.9"]:
+        result = sync.plan(
+            pyproject=PLAN_PYPROJECT,
+            pre_commit_config=PLAN_PRE_COMMIT_CONFIG.replace("v0.9", rev),
+            uv_lock=PLAN_UV_LOCK,
+            lock_index=lock_index,
+        )
+        assert "rev: v1.0" in result.pre_commit_config
+
+    # The uv.lock shared by both calls was only parsed and scanned once
+    assert parse_lock.call_count == 1
+    assert read_package_versions.call_count == 1
+
+
+def test_plan__flow_style():
+    # The repo isn't found by scan_pre_commit_config: the export isn't
+    # prefetched, but started when needed.
+    result = sync.plan(
+        pyproject=PLAN_PYPROJECT,
+        pre_commit_config="""repos: [{repo: "https://github.com/foo/mypy", rev: v0.9,
+  hooks: [{id: mypy}]}]
+""",
+        uv_lock=PLAN_UV_LOCK,
+    )
+
+    assert len(result.updates) == 2
+    assert result.summary.uv_export_calls_native == 1
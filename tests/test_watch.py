@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+import pathlib
+
+from sync_pre_commit_with_uv import watch
+
+
+def test_get_signature(tmp_path: pathlib.Path):
+    path = tmp_path / "file.txt"
+    assert watch.get_signature(path) is None
+
+    path.write_text("foo")
+    signature = watch.get_signature(path)
+    assert signature is not None
+
+    path.write_text("foobar")
+    assert watch.get_signature(path) != signature
+
+
+def test_watcher(tmp_path: pathlib.Path):
+    path_a = tmp_path / "a.txt"
+    path_b = tmp_path / "b.txt"
+    path_a.write_text("foo")
+    watcher = watch.Watcher([path_a])
+    assert watcher.poll() == set()
+
+    path_a.write_text("foobar")
+    watcher.add([path_b, tmp_path / "." / "a.txt"])
+    path_b.write_text("bar")
+
+    assert watcher.poll() == {path_a.resolve(), path_b.resolve()}
+    assert watcher.poll() == set()
+
+    # Same size, different modification time
+    path_b.write_text("baz")
+    os.utime(path_b, ns=(0, 0))
+    path_a.unlink()
+    assert watcher.poll() == {path_a.resolve(), path_b.resolve()}
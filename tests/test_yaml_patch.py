@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import pytest
+import ruamel.yaml
+
+from sync_pre_commit_with_uv import sync, yaml_patch
+
+CONFIG = """repos:
+- repo: https://github.com/foo/bar  # comment
+  rev: "v1.0.0"   # keep me
+  hooks:
+  -   id: mypy
+      additional_dependencies:
+      -   a==1.0  # first
+      -   b==2.0
+      args: [--strict]
+  - id: flow
+    additional_dependencies: ['a==1.0', 'b==2.0']
+"""
+
+
+def run_patch(text: str, *updates) -> str | None:
+    data = ruamel.yaml.YAML(typ="safe").load(text)
+    index = sync.PreCommitIndex(data)
+    for update in updates:
+        update.apply(index)
+    return yaml_patch.patch(text, updates, expected=data)
+
+
+def rev(value: str) -> sync.UpdateRev:
+    return sync.UpdateRev(repo="https://github.com/foo/bar", position=0, value=value)
+
+
+def deps(hook_id: str, *value: str) -> sync.UpdateAdditionalDependencies:
+    return sync.UpdateAdditionalDependencies(
+        repo="https://github.com/foo/bar",
+        position=0,
+        hook_id=hook_id,
+        value=list(value),
+    )
+
+
+def test_patch__rev():
+    assert run_patch(CONFIG, rev("v2.0.0")) == CONFIG.replace('"v1.0.0"', '"v2.0.0"')
+
+
+def test_patch__dependencies_changed():
+    assert run_patch(CONFIG, deps("mypy", "a==1.1", "b==2.0")) == CONFIG.replace(
+        "a==1.0  # first", "a==1.1  # first"
+    )
+
+
+def test_patch__dependencies_added():
+    assert run_patch(CONFIG, deps("mypy", "a==1.0", "b==2.0", "c==3.0")) == (
+        CONFIG.replace("-   b==2.0\n", "-   b==2.0\n      -   c==3.0\n")
+    )
+
+
+def test_patch__dependencies_removed():
+    assert run_patch(CONFIG, deps("mypy", "a==1.0")) == CONFIG.replace(
+        "      -   b==2.0\n", ""
+    )
+
+
+def test_patch__flow_sequence():
+    assert run_patch(CONFIG, deps("flow", "c==3.0 ; sys_platform == 'win32'")) == (
+        CONFIG.replace("['a==1.0', 'b==2.0']", "['c==3.0 ; sys_platform == ''win32''']")
+    )
+
+
+def test_patch__crlf():
+    text = CONFIG.replace("\n", "\r\n")
+    assert run_patch(text, deps("mypy", "a==1.0", "b==2.0", "c==3.0")) == (
+        text.replace("-   b==2.0\r\n", "-   b==2.0\r\n      -   c==3.0\r\n")
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Missing keys
+        """repos:
+- repo: https://github.com/foo/bar
+  hooks:
+  - id: mypy
+""",
+        # Empty sequence
+        """repos:
+- repo: https://github.com/foo/bar
+  rev: v1
+  hooks:
+  - id: mypy
+    additional_dependencies: []
+""",
+        # Block scalar
+        """repos:
+- repo: https://github.com/foo/bar
+  rev: |
+    v1
+  hooks:
+  - id: mypy
+    additional_dependencies: [a]
+""",
+    ],
+)
+def test_patch__not_possible(text):
+    assert run_patch(text, rev("v2"), deps("mypy", "c==3.0")) is None
+
+
+def test_patch__empty_dependencies():
+    assert run_patch(CONFIG, deps("mypy")) is None
+
+
+@pytest.mark.parametrize(
+    ("value", "style", "expected"),
+    [
+        ("v1.0.0", None, "v1.0.0"),
+        ("v1.0.0", "", "v1.0.0"),
+        ("1.0", None, '"1.0"'),
+        ("yes: no", None, '"yes: no"'),
+        ("a #b", None, '"a #b"'),
+        ("it's", "'", "'it''s'"),
+        ("v1", '"', '"v1"'),
+    ],
+)
+def test_render_scalar(value, style, expected):
+    assert yaml_patch.render_scalar(value, style) == expected
+
+
+def test_apply_edits__overlap():
+    edits = [yaml_patch.Edit(0, 3, "x"), yaml_patch.Edit(2, 4, "y")]
+    assert yaml_patch.apply_edits("abcdef", edits) is None